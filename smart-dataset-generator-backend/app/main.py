@@ -6,6 +6,9 @@ FastAPI application entry point
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.routes import api_routes, chatbot_routes, download_routes
+from app.services.news_sources_service import news_sources_catalog
+from app.services.weather_collector_service import weather_collector
+from config.config import config
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -30,6 +33,20 @@ app.include_router(api_routes.router, prefix="/api", tags=["Data APIs"])
 app.include_router(chatbot_routes.router, prefix="/chatbot", tags=["Chatbot"])
 app.include_router(download_routes.router, prefix="/download", tags=["Downloads"])
 
+@app.on_event("startup")
+async def start_background_services():
+    """Start optional background collectors"""
+    if config.WEATHER_COLLECTOR_ENABLED:
+        weather_collector.start()
+    if config.NEWSAPI_API_KEY:
+        news_sources_catalog.start()
+
+@app.on_event("shutdown")
+async def stop_background_services():
+    """Stop background collectors"""
+    weather_collector.stop()
+    news_sources_catalog.stop()
+
 @app.get("/")
 async def root():
     """Root endpoint with API information"""
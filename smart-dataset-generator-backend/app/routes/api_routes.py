@@ -4,15 +4,28 @@ Handles OpenWeatherMap, Alpha Vantage, NewsAPI, Pexels, and COVID-19 endpoints
 """
 
 from fastapi import APIRouter, HTTPException, Query, Path
+from fastapi.responses import StreamingResponse
 from typing import Optional, List
+from datetime import date
+from pydantic import BaseModel
 from app.services.openweather_service import OpenWeatherService
 from app.services.alphavantage_service import AlphaVantageService
 from app.services.newsapi_service import NewsAPIService
 from app.services.pexels_service import PexelsService
 from app.services.covid_service import COVIDService
+from app.services.covid_series_service import covid_series_store
+from app.services.image_dataset_service import image_dataset_builder
+from app.services.news_sources_service import news_sources_catalog
+from app.services.quote_stream_service import quote_streamer
+from app.services.video_export_service import VIDEO_QUALITIES, select_rendition
+from app.services.weather_backfill_service import weather_backfill_service
+from app.services.weather_collector_service import weather_collector
+from app.utils.gazetteer import gazetteer
 from app.utils.helpers import (
     format_weather_data, format_stock_data, format_news_data, 
-    format_image_data, validate_coordinates, validate_date_range
+    format_image_data, validate_coordinates, validate_date_range,
+    format_forecast_table, aggregate_daily_forecast, dataframe_to_records,
+    format_fan_out_news, format_video_data
 )
 
 router = APIRouter()
@@ -62,23 +75,121 @@ async def get_weather_by_coordinates(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/weather/batch")
+async def get_weather_batch(
+    cities: Optional[List[str]] = Query(None, description="City names, optionally 'City,CC' (repeatable)"),
+    coordinates: Optional[List[str]] = Query(None, description="'lat,lon' pairs (repeatable)")
+):
+    """Get current weather for many locations as one flat table"""
+    try:
+        data = weather_service.get_weather_batch(cities, coordinates)
+        if "error" in data:
+            raise HTTPException(status_code=400, detail=data["error"])
+        
+        return {"success": True, "data": data}
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/weather/cities")
+async def autocomplete_cities(
+    prefix: str = Query(..., description="City name prefix"),
+    limit: int = Query(10, description="Maximum number of suggestions")
+):
+    """Autocomplete city names from the local gazetteer (no upstream call)"""
+    try:
+        return {"success": True, "data": gazetteer.autocomplete(prefix, limit)}
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/weather/forecast")
 async def get_weather_forecast(
     city: str = Query(..., description="City name"),
-    days: int = Query(5, description="Number of days (1-5)")
+    days: int = Query(5, description="Number of days (1-5)"),
+    view: str = Query("raw", description="raw (OpenWeather payload), table (3-hourly rows) or daily (per-day aggregates)")
 ):
     """Get weather forecast. Returns OpenWeather 3-hourly forecast list (up to ~40 entries)."""
     try:
         if days < 1 or days > 5:
             raise HTTPException(status_code=400, detail="Days must be between 1 and 5")
+        if view not in ["raw", "table", "daily"]:
+            raise HTTPException(status_code=400, detail="View must be 'raw', 'table' or 'daily'")
         
         data = weather_service.get_forecast(city, days)
         if "error" in data:
             raise HTTPException(status_code=400, detail=data["error"])
         
-        # Return raw forecast data with 'list' to match frontend expectations
+        if view == "raw":
+            # Return raw forecast data with 'list' to match frontend expectations
+            return {"success": True, "data": data}
+        
+        table = format_forecast_table(data)
+        if view == "daily":
+            table = aggregate_daily_forecast(table)
+        return {"success": True, "data": dataframe_to_records(table)}
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+class BackfillRequest(BaseModel):
+    locations: List[str]
+    start_date: str
+    end_date: str
+
+@router.post("/weather/backfill")
+async def start_weather_backfill(payload: BackfillRequest):
+    """Start or resume a historical weather backfill job.
+    Re-submitting the same request resumes from the last checkpointed day.
+    """
+    try:
+        data = weather_backfill_service.start_job(payload.locations, payload.start_date, payload.end_date)
+        if "error" in data:
+            raise HTTPException(status_code=400, detail=data["error"])
+        
+        return {"success": True, "data": data}
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/weather/backfill/{job_id}")
+async def get_weather_backfill_status(job_id: str = Path(..., description="Backfill job ID")):
+    """Get progress of a historical weather backfill job"""
+    try:
+        data = weather_backfill_service.get_status(job_id)
+        if "error" in data:
+            raise HTTPException(status_code=404, detail=data["error"])
+        
+        return {"success": True, "data": data}
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/weather/series/status")
+async def get_weather_collector_status():
+    """Get the scheduled weather collector's locations, interval and last run"""
+    return {"success": True, "data": weather_collector.get_status()}
+
+@router.post("/weather/series/collect")
+async def collect_weather_sample():
+    """Sample every collector location now and append it to the local store"""
+    try:
+        data = weather_collector.collect_once()
+        if "error" in data:
+            raise HTTPException(status_code=400, detail=data["error"])
+        
         return {"success": True, "data": data}
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -96,6 +207,22 @@ async def get_stock_quote(symbol: str = Path(..., description="Stock symbol")):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/stocks/stream/{symbol}")
+async def stream_stock_quote(symbol: str = Path(..., description="Stock symbol")):
+    """Stream live stock quotes as Server-Sent Events.
+    All subscribers to a symbol share a single upstream poller.
+    """
+    return StreamingResponse(
+        quote_streamer.stream(symbol),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/stocks/stream-status")
+async def get_stream_status():
+    """Get active quote pollers and their current poll interval"""
+    return {"success": True, "data": quote_streamer.get_status()}
+
 @router.get("/stocks/daily/{symbol}")
 async def get_daily_stock_data(
     symbol: str = Path(..., description="Stock symbol"),
@@ -126,22 +253,87 @@ async def get_company_overview(symbol: str = Path(..., description="Stock symbol
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# Forex endpoints
+@router.get("/forex/matrix")
+async def get_forex_matrix(
+    currencies: str = Query(..., description="Comma-separated currency codes (e.g., 'EUR,GBP,JPY')")
+):
+    """Get a cross-rate matrix for a set of currencies"""
+    try:
+        data = stock_service.get_forex_matrix(currencies.split(","))
+        if "error" in data:
+            raise HTTPException(status_code=400, detail=data["error"])
+        
+        return {"success": True, "data": data}
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 # News endpoints
 @router.get("/news/headlines")
 async def get_top_headlines(
     country: str = Query("us", description="Country code"),
     category: Optional[str] = Query(None, description="News category"),
+    sources: Optional[str] = Query(None, description="Comma-separated source ids (overrides country/category)"),
     page_size: int = Query(20, description="Number of articles")
 ):
     """Get top news headlines"""
     try:
-        data = news_service.get_top_headlines(country, category, page_size)
+        if sources:
+            source_ids = [source_id.strip() for source_id in sources.split(",") if source_id.strip()]
+            unknown = news_sources_catalog.unknown_sources(source_ids)
+            if unknown:
+                raise HTTPException(status_code=400, detail=f"Unknown news sources: {', '.join(unknown)}")
+            sources = ",".join(source_ids)
+        
+        data = news_service.get_top_headlines(country, category, sources=sources, page_size=page_size)
         if "error" in data:
             raise HTTPException(status_code=400, detail=data["error"])
         
         formatted_data = format_news_data(data)
         return {"success": True, "data": formatted_data}
     
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/news/sources")
+async def get_news_sources(
+    category: Optional[str] = Query(None, description="News category"),
+    language: Optional[str] = Query(None, description="Language code"),
+    country: Optional[str] = Query(None, description="Country code")
+):
+    """List news sources from the locally cached catalog, with filter facets"""
+    try:
+        sources = news_sources_catalog.find(category, language, country)
+        return {
+            "success": True,
+            "data": {
+                "sources": sources,
+                "count": len(sources),
+                "facets": news_sources_catalog.facets(),
+                "catalog": news_sources_catalog.get_status()
+            }
+        }
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/news/sources/refresh")
+async def refresh_news_sources():
+    """Refresh the sources catalog from NewsAPI now"""
+    try:
+        data = news_sources_catalog.refresh()
+        if "error" in data:
+            raise HTTPException(status_code=400, detail=data["error"])
+        
+        return {"success": True, "data": data}
+    
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -163,14 +355,108 @@ async def search_news(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/news/local-search")
+async def search_local_news(
+    query: str = Query(..., description="Search query"),
+    from_date: Optional[str] = Query(None, description="Earliest publish date (YYYY-MM-DD)"),
+    to_date: Optional[str] = Query(None, description="Latest publish date (YYYY-MM-DD, inclusive)"),
+    page_size: int = Query(20, description="Number of articles")
+):
+    """Search every previously fetched article locally with BM25 ranking (no NewsAPI quota used)"""
+    try:
+        data = news_service.search_local(query, from_date, to_date, page_size)
+        if "error" in data:
+            raise HTTPException(status_code=400, detail=data["error"])
+        
+        formatted_data = format_news_data(data)
+        for article, score in zip(formatted_data["articles"], data["scores"]):
+            article["score"] = score
+        formatted_data["indexed_articles"] = data["indexed_articles"]
+        return {"success": True, "data": formatted_data}
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/news/crawl")
+async def crawl_news(
+    query: str = Query(..., description="Search query"),
+    language: str = Query("en", description="Language code"),
+    max_pages: int = Query(5, description="Maximum number of 100-article pages to fetch")
+):
+    """Crawl multiple result pages concurrently and merge deduplicated articles"""
+    try:
+        data = news_service.crawl_news(query, language, max_pages=max_pages)
+        if "error" in data:
+            raise HTTPException(status_code=400, detail=data["error"])
+        
+        formatted_data = format_news_data(data)
+        formatted_data["pages_fetched"] = data["pages_fetched"]
+        formatted_data["duplicates_removed"] = data["duplicates_removed"]
+        return {"success": True, "data": formatted_data}
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/news/keywords")
+async def get_news_by_keywords(
+    keywords: List[str] = Query(..., description="Keywords, each queried separately (repeatable)"),
+    domains: Optional[List[str]] = Query(None, description="Optional domains to fan out over as well (repeatable)"),
+    language: str = Query("en", description="Language code"),
+    page_size: int = Query(20, description="Articles per keyword/domain query")
+):
+    """Query each keyword concurrently and merge the results with per-keyword attribution"""
+    try:
+        data = news_service.fan_out_news(keywords, domains, language, page_size)
+        if "error" in data:
+            raise HTTPException(status_code=400, detail=data["error"])
+        
+        formatted_data = format_fan_out_news(data)
+        formatted_data["query_counts"] = data["query_counts"]
+        formatted_data["query_errors"] = data["query_errors"]
+        formatted_data["duplicates_removed"] = data["duplicates_removed"]
+        return {"success": True, "data": formatted_data}
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/news/domains")
+async def get_news_by_domains(
+    domains: List[str] = Query(..., description="Domains, each queried separately (repeatable)"),
+    page_size: int = Query(20, description="Articles per domain")
+):
+    """Query each domain concurrently and merge the results with per-domain attribution"""
+    try:
+        data = news_service.fan_out_news(domains=domains, page_size=page_size)
+        if "error" in data:
+            raise HTTPException(status_code=400, detail=data["error"])
+        
+        formatted_data = format_fan_out_news(data)
+        formatted_data["query_counts"] = data["query_counts"]
+        formatted_data["query_errors"] = data["query_errors"]
+        formatted_data["duplicates_removed"] = data["duplicates_removed"]
+        return {"success": True, "data": formatted_data}
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/news/trending")
 async def get_trending_topics(
     country: str = Query("us", description="Country code"),
-    category: str = Query("general", description="News category")
+    category: str = Query("general", description="News category"),
+    limit: int = Query(20, description="Number of terms and bigrams to return"),
+    refresh: bool = Query(False, description="Fetch fresh headlines before ranking")
 ):
-    """Get trending topics"""
+    """Get trending terms and bigrams from time-decayed headline statistics"""
     try:
-        data = news_service.get_trending_topics(country, category)
+        data = news_service.get_trending_topics(country, category, limit, refresh)
         if "error" in data:
             raise HTTPException(status_code=400, detail=data["error"])
         
@@ -218,26 +504,103 @@ async def get_curated_images(
 @router.get("/images/category/{category}")
 async def get_images_by_category(
     category: str = Path(..., description="Image category"),
-    per_page: int = Query(15, description="Number of images")
+    per_page: int = Query(15, description="Number of images"),
+    page: int = Query(1, description="Page of the merged results")
 ):
-    """Get images by category"""
+    """Get images by category, searching each category term concurrently"""
     try:
-        data = image_service.search_photos_by_category(category, per_page)
+        data = image_service.search_photos_by_category(category, per_page, page)
         if "error" in data:
             raise HTTPException(status_code=400, detail=data["error"])
         
         formatted_data = format_image_data(data)
+        formatted_data.update({key: data[key] for key in ("category", "page", "per_page", "term_counts", "term_errors", "duplicates_removed")})
+        return {"success": True, "data": formatted_data}
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/videos/search")
+async def search_videos(
+    query: str = Query(..., description="Search query"),
+    per_page: int = Query(15, description="Number of videos"),
+    page: int = Query(1, description="Page number"),
+    orientation: Optional[str] = Query(None, description="landscape, portrait or square"),
+    size: Optional[str] = Query(None, description="Minimum size: large, medium or small"),
+    min_duration: Optional[int] = Query(None, description="Minimum duration in seconds"),
+    max_duration: Optional[int] = Query(None, description="Maximum duration in seconds"),
+    quality: Optional[str] = Query(None, description="Preferred rendition: uhd, hd or sd"),
+    max_width: Optional[int] = Query(None, description="Widest rendition to select")
+):
+    """Search for videos; each result includes the rendition an export would download"""
+    try:
+        if quality and quality not in VIDEO_QUALITIES:
+            raise HTTPException(status_code=400, detail=f"quality must be one of {', '.join(VIDEO_QUALITIES)}")
+        
+        data = image_service.get_videos(query, per_page, page, orientation, size, min_duration, max_duration)
+        if "error" in data:
+            raise HTTPException(status_code=400, detail=data["error"])
+        
+        formatted_data = format_video_data(data)
+        for video in formatted_data["videos"]:
+            video["selected_file"] = select_rendition(video, quality, max_width)
         return {"success": True, "data": formatted_data}
     
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+class ImageDatasetRequest(BaseModel):
+    queries: List[str]
+    images_per_query: int = 100
+    variant: str = "large"
+    orientation: Optional[str] = None
+    shard_size: Optional[int] = None
+    features: bool = False
+
+@router.post("/images/dataset")
+async def start_image_dataset(payload: ImageDatasetRequest):
+    """Start or resume a labelled image dataset job (one label per query).
+    Re-submitting the same request resumes downloading where it stopped.
+    """
+    try:
+        data = image_dataset_builder.start_job(payload.queries, payload.images_per_query,
+                                               payload.variant, payload.orientation, payload.shard_size,
+                                               payload.features)
+        if "error" in data:
+            raise HTTPException(status_code=400, detail=data["error"])
+        
+        return {"success": True, "data": data}
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/images/dataset/{job_id}")
+async def get_image_dataset_status(job_id: str = Path(..., description="Image dataset job ID")):
+    """Get progress of an image dataset job"""
+    try:
+        data = image_dataset_builder.get_status(job_id)
+        if "error" in data:
+            raise HTTPException(status_code=404, detail=data["error"])
+        
+        return {"success": True, "data": data}
+    
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 # COVID-19 endpoints
 @router.get("/covid/global")
 async def get_global_covid_data():
-    """Get global COVID-19 summary"""
+    """Get global COVID-19 summary (served from the shared summary snapshot)"""
     try:
-        data = covid_service.get_global_summary()
+        data = covid_service.get_cached_summary()
         if "error" in data:
             raise HTTPException(status_code=400, detail=data["error"])
         
@@ -248,31 +611,64 @@ async def get_global_covid_data():
 
 @router.get("/covid/country/{country}")
 async def get_country_covid_data(
-    country: str = Path(..., description="Country name or code")
+    country: str = Path(..., description="Country slug, ISO2 code or name")
 ):
-    """Get COVID-19 data for a specific country"""
+    """Get the COVID-19 summary for a specific country from the shared snapshot"""
     try:
-        data = covid_service.get_country_data(country)
+        data = covid_service.get_country_summary(country)
         if "error" in data:
-            raise HTTPException(status_code=400, detail=data["error"])
+            raise HTTPException(status_code=404 if "not found" in data["error"] else 400, detail=data["error"])
         
         return {"success": True, "data": data}
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/covid/top-countries")
 async def get_top_countries_by_cases(
-    limit: int = Query(10, description="Number of countries to return")
+    limit: int = Query(10, description="Number of countries to return"),
+    metric: str = Query("TotalConfirmed", description="TotalConfirmed, TotalDeaths, TotalRecovered, NewConfirmed, NewDeaths or NewRecovered")
+):
+    """Get top countries by a COVID-19 metric from precomputed rankings"""
+    try:
+        data = covid_service.get_top_countries_by_cases(limit, metric)
+        if "error" in data:
+            raise HTTPException(status_code=400, detail=data["error"])
+        
+        return {"success": True, "data": data}
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/covid/series/{country}")
+async def get_covid_series(
+    country: str = Path(..., description="Country slug, ISO2 code or name, or 'world'"),
+    start: Optional[str] = Query(None, description="Start date YYYY-MM-DD (defaults to 2020-01-22)"),
+    end: Optional[str] = Query(None, description="End date YYYY-MM-DD (defaults to today)")
 ):
-    """Get top countries by COVID-19 cases"""
+    """Get daily COVID-19 counts with derived metrics from the local time-series store.
+    Days not stored yet are fetched once in parallel date windows.
+    """
     try:
-        data = covid_service.get_top_countries_by_cases(limit)
+        try:
+            start_date = date.fromisoformat(start) if start else None
+            end_date = date.fromisoformat(end) if end else None
+        except ValueError:
+            raise HTTPException(status_code=400, detail="start and end must be YYYY-MM-DD dates")
+        
+        data = covid_series_store.get_metrics(country, start_date, end_date)
         if "error" in data:
             raise HTTPException(status_code=400, detail=data["error"])
         
+        data["metrics"] = dataframe_to_records(data["metrics"])
         return {"success": True, "data": data}
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -3,21 +3,34 @@ Download routes for dataset exports
 Handles CSV, JSON, Parquet, and ZIP file downloads
 """
 
+import asyncio
 from fastapi import APIRouter, HTTPException, Query, Path
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from typing import Optional, List, Dict, Any
 import os
 import tempfile
-from datetime import datetime
+import zipfile
+from datetime import date, datetime, timedelta
+from config.config import config
 from app.services.openweather_service import OpenWeatherService
 from app.services.alphavantage_service import AlphaVantageService
+from app.services.article_text_service import ArticleTextService
 from app.services.newsapi_service import NewsAPIService
 from app.services.pexels_service import PexelsService
 from app.services.covid_service import COVIDService
+from app.services.covid_series_service import covid_series_store
+from app.services.image_dataset_service import image_dataset_builder
+from app.services.video_export_service import VIDEO_QUALITIES, VideoExporter
+from app.services.weather_backfill_service import weather_backfill_service
+from app.services.weather_collector_service import weather_collector
+from app.utils.image_utils import HASH_TYPES, validate_image_options
+from app.utils.text_utils import NEAR_DUPLICATE_DISTANCE
 from app.utils.helpers import (
     save_to_csv, save_to_json, save_to_parquet, download_images,
-    cleanup_temp_file, format_weather_data, format_stock_data,
-    format_news_data, format_image_data
+    create_temp_file, cleanup_temp_file, format_weather_data, format_stock_data,
+    format_news_data, format_image_data, format_forecast_table,
+    aggregate_daily_forecast, iter_csv, mark_near_duplicates,
+    format_fan_out_news
 )
 
 router = APIRouter()
@@ -28,6 +41,8 @@ stock_service = AlphaVantageService()
 news_service = NewsAPIService()
 image_service = PexelsService()
 covid_service = COVIDService()
+article_text_service = ArticleTextService()
+video_exporter = VideoExporter()
 
 @router.get("/weather/csv")
 async def download_weather_csv(
@@ -88,6 +103,197 @@ async def download_weather_json(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/weather/batch/csv")
+async def download_weather_batch_csv(
+    cities: Optional[List[str]] = Query(None, description="City names, optionally 'City,CC' (repeatable)"),
+    coordinates: Optional[List[str]] = Query(None, description="'lat,lon' pairs (repeatable)")
+):
+    """Download weather for many locations as a single CSV table"""
+    try:
+        # Get weather data
+        data = weather_service.get_weather_batch(cities, coordinates)
+        if "error" in data:
+            raise HTTPException(status_code=400, detail=data["error"])
+        
+        # Create CSV file
+        file_path = save_to_csv(data["rows"], f"weather_batch_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
+        
+        # Return file response
+        return FileResponse(
+            path=file_path,
+            filename=f"weather_batch_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+            media_type="text/csv",
+            background=lambda: cleanup_temp_file(file_path)
+        )
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/weather/forecast/csv")
+async def download_weather_forecast_csv(
+    city: str = Query(..., description="City name"),
+    days: int = Query(5, description="Number of days (1-5)"),
+    daily: bool = Query(False, description="Aggregate to one row per day")
+):
+    """Download weather forecast as CSV"""
+    try:
+        # Get forecast data
+        data = weather_service.get_forecast(city, days)
+        if "error" in data:
+            raise HTTPException(status_code=400, detail=data["error"])
+        
+        # Format data as a table
+        table = format_forecast_table(data)
+        if daily:
+            table = aggregate_daily_forecast(table)
+        if table.empty:
+            raise HTTPException(status_code=400, detail="No forecast data available")
+        
+        # Create CSV file
+        file_path = save_to_csv(table.to_dict(orient="records"), f"forecast_{city}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
+        
+        # Return file response
+        return FileResponse(
+            path=file_path,
+            filename=f"forecast_{city}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+            media_type="text/csv",
+            background=lambda: cleanup_temp_file(file_path)
+        )
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/weather/forecast/parquet")
+async def download_weather_forecast_parquet(
+    city: str = Query(..., description="City name"),
+    days: int = Query(5, description="Number of days (1-5)"),
+    daily: bool = Query(False, description="Aggregate to one row per day")
+):
+    """Download weather forecast as Parquet"""
+    try:
+        # Get forecast data
+        data = weather_service.get_forecast(city, days)
+        if "error" in data:
+            raise HTTPException(status_code=400, detail=data["error"])
+        
+        # Format data as a table
+        table = format_forecast_table(data)
+        if daily:
+            table = aggregate_daily_forecast(table)
+        if table.empty:
+            raise HTTPException(status_code=400, detail="No forecast data available")
+        
+        # Create Parquet file
+        file_path = save_to_parquet(table.to_dict(orient="records"), f"forecast_{city}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.parquet")
+        
+        # Return file response
+        return FileResponse(
+            path=file_path,
+            filename=f"forecast_{city}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.parquet",
+            media_type="application/octet-stream",
+            background=lambda: cleanup_temp_file(file_path)
+        )
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/weather/backfill/{job_id}/parquet")
+async def download_weather_backfill_parquet(
+    job_id: str = Path(..., description="Backfill job ID")
+):
+    """Download the completed part of a historical weather backfill as Parquet"""
+    try:
+        # Read checkpointed partitions
+        results = weather_backfill_service.load_results(job_id)
+        if results.empty:
+            raise HTTPException(status_code=400, detail="No backfilled data available")
+        
+        # Create Parquet file
+        file_path = save_to_parquet(results.to_dict(orient="records"), f"weather_backfill_{job_id}.parquet")
+        
+        # Return file response
+        return FileResponse(
+            path=file_path,
+            filename=f"weather_backfill_{job_id}.parquet",
+            media_type="application/octet-stream",
+            background=lambda: cleanup_temp_file(file_path)
+        )
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+def _read_weather_series(start: str, end: Optional[str], location: Optional[str]):
+    """Parse the requested range and read collected observations from local storage"""
+    try:
+        start_time = datetime.fromisoformat(start)
+        end_time = datetime.fromisoformat(end) if end else datetime.now()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="start and end must be ISO dates or datetimes")
+    if len(end or "") == 10:
+        # A bare end date covers the whole day
+        end_time += timedelta(days=1, microseconds=-1)
+    
+    series = weather_collector.read_series(start_time, end_time, location)
+    if series.empty:
+        raise HTTPException(status_code=400, detail="No collected weather data in this range")
+    return series
+
+@router.get("/weather/series/csv")
+async def download_weather_series_csv(
+    start: str = Query(..., description="Range start (YYYY-MM-DD or ISO datetime)"),
+    end: Optional[str] = Query(None, description="Range end (defaults to now)"),
+    location: Optional[str] = Query(None, description="Filter by location")
+):
+    """Download collected weather time series as CSV (served from local storage)"""
+    try:
+        series = _read_weather_series(start, end, location)
+        
+        # Create CSV file
+        file_path = save_to_csv(series.to_dict(orient="records"), f"weather_series_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
+        
+        # Return file response
+        return FileResponse(
+            path=file_path,
+            filename=f"weather_series_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+            media_type="text/csv",
+            background=lambda: cleanup_temp_file(file_path)
+        )
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/weather/series/parquet")
+async def download_weather_series_parquet(
+    start: str = Query(..., description="Range start (YYYY-MM-DD or ISO datetime)"),
+    end: Optional[str] = Query(None, description="Range end (defaults to now)"),
+    location: Optional[str] = Query(None, description="Filter by location")
+):
+    """Download collected weather time series as Parquet (served from local storage)"""
+    try:
+        series = _read_weather_series(start, end, location)
+        
+        # Create Parquet file
+        file_path = save_to_parquet(series.to_dict(orient="records"), f"weather_series_{datetime.now().strftime('%Y%m%d_%H%M%S')}.parquet")
+        
+        # Return file response
+        return FileResponse(
+            path=file_path,
+            filename=f"weather_series_{datetime.now().strftime('%Y%m%d_%H%M%S')}.parquet",
+            media_type="application/octet-stream",
+            background=lambda: cleanup_temp_file(file_path)
+        )
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/stocks/csv/{symbol}")
 async def download_stocks_csv(
     symbol: str = Path(..., description="Stock symbol"),
@@ -158,7 +364,10 @@ async def download_stocks_parquet(
 async def download_news_csv(
     query: str = Query(..., description="Search query"),
     language: str = Query("en", description="Language code"),
-    page_size: int = Query(20, description="Number of articles")
+    page_size: int = Query(20, description="Number of articles"),
+    dedup: bool = Query(False, description="Drop near-duplicate (syndicated) articles"),
+    max_distance: int = Query(NEAR_DUPLICATE_DISTANCE, description="SimHash distance (bits of 64) treated as near-duplicate"),
+    full_text: bool = Query(False, description="Fetch and extract each article's full body text")
 ):
     """Download news data as CSV"""
     try:
@@ -169,7 +378,9 @@ async def download_news_csv(
         
         # Format data for CSV
         formatted_data = format_news_data(data)
-        csv_data = formatted_data.get("articles", [])
+        csv_data = mark_near_duplicates(formatted_data.get("articles", []), drop=dedup, max_distance=max_distance)
+        if full_text:
+            csv_data = await asyncio.to_thread(article_text_service.add_full_text, csv_data)
         
         if not csv_data:
             raise HTTPException(status_code=400, detail="No news data available")
@@ -192,7 +403,10 @@ async def download_news_csv(
 async def download_news_json(
     query: str = Query(..., description="Search query"),
     language: str = Query("en", description="Language code"),
-    page_size: int = Query(20, description="Number of articles")
+    page_size: int = Query(20, description="Number of articles"),
+    dedup: bool = Query(False, description="Drop near-duplicate (syndicated) articles"),
+    max_distance: int = Query(NEAR_DUPLICATE_DISTANCE, description="SimHash distance (bits of 64) treated as near-duplicate"),
+    full_text: bool = Query(False, description="Fetch and extract each article's full body text")
 ):
     """Download news data as JSON"""
     try:
@@ -203,6 +417,9 @@ async def download_news_json(
         
         # Format data
         formatted_data = format_news_data(data)
+        formatted_data["articles"] = mark_near_duplicates(formatted_data.get("articles", []), drop=dedup, max_distance=max_distance)
+        if full_text:
+            formatted_data["articles"] = await asyncio.to_thread(article_text_service.add_full_text, formatted_data["articles"])
         
         # Create JSON file
         file_path = save_to_json(formatted_data, f"news_{query.replace(' ', '_')}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
@@ -218,14 +435,105 @@ async def download_news_json(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/news/crawl/csv")
+async def download_news_crawl_csv(
+    query: str = Query(..., description="Search query"),
+    language: str = Query("en", description="Language code"),
+    max_pages: int = Query(5, description="Maximum number of 100-article pages to fetch"),
+    dedup: bool = Query(False, description="Drop near-duplicate (syndicated) articles"),
+    max_distance: int = Query(NEAR_DUPLICATE_DISTANCE, description="SimHash distance (bits of 64) treated as near-duplicate"),
+    full_text: bool = Query(False, description="Fetch and extract each article's full body text")
+):
+    """Crawl multiple result pages and stream the merged articles as CSV"""
+    try:
+        # Crawl news pages
+        data = news_service.crawl_news(query, language, max_pages=max_pages)
+        if "error" in data:
+            raise HTTPException(status_code=400, detail=data["error"])
+        
+        # Format data for CSV
+        articles = mark_near_duplicates(format_news_data(data).get("articles", []), drop=dedup, max_distance=max_distance)
+        if full_text:
+            articles = await asyncio.to_thread(article_text_service.add_full_text, articles)
+        if not articles:
+            raise HTTPException(status_code=400, detail="No news data available")
+        
+        # Stream rows instead of materializing a temp file
+        filename = f"news_crawl_{query.replace(' ', '_')}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+        return StreamingResponse(
+            iter_csv(articles),
+            media_type="text/csv",
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+        )
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/news/fan-out/csv")
+async def download_news_fan_out_csv(
+    keywords: Optional[List[str]] = Query(None, description="Keywords, each queried separately (repeatable)"),
+    domains: Optional[List[str]] = Query(None, description="Domains, each queried separately (repeatable)"),
+    language: str = Query("en", description="Language code"),
+    page_size: int = Query(20, description="Articles per keyword/domain query"),
+    dedup: bool = Query(False, description="Drop near-duplicate (syndicated) articles"),
+    max_distance: int = Query(NEAR_DUPLICATE_DISTANCE, description="SimHash distance (bits of 64) treated as near-duplicate"),
+    full_text: bool = Query(False, description="Fetch and extract each article's full body text")
+):
+    """Fan out over keywords and domains and stream the merged, attributed articles as CSV"""
+    try:
+        # Query every keyword and domain concurrently
+        data = news_service.fan_out_news(keywords, domains, language, page_size)
+        if "error" in data:
+            raise HTTPException(status_code=400, detail=data["error"])
+        
+        # Format data for CSV
+        articles = mark_near_duplicates(format_fan_out_news(data).get("articles", []), drop=dedup, max_distance=max_distance)
+        if full_text:
+            articles = await asyncio.to_thread(article_text_service.add_full_text, articles)
+        if not articles:
+            raise HTTPException(status_code=400, detail="No news data available")
+        
+        filename = f"news_fan_out_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+        return StreamingResponse(
+            iter_csv(articles),
+            media_type="text/csv",
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+        )
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/images/zip")
 async def download_images_zip(
     query: str = Query(..., description="Search query"),
     per_page: int = Query(10, description="Number of images"),
-    orientation: Optional[str] = Query(None, description="Image orientation")
+    orientation: Optional[str] = Query(None, description="Image orientation"),
+    width: Optional[int] = Query(None, description="Target width in pixels (originals are kept if width and height are omitted)"),
+    height: Optional[int] = Query(None, description="Target height in pixels"),
+    fit: str = Query("resize", description="resize (keep aspect), crop (center-crop) or letterbox (pad)"),
+    image_format: Optional[str] = Query(None, alias="format", description="Re-encode as jpeg, webp or png"),
+    quality: int = Query(85, description="JPEG/WebP quality (1-100)"),
+    dedup: bool = Query(False, description="Drop perceptual near-duplicates and include a hash manifest"),
+    hash_type: str = Query("phash", description="Perceptual hash used for dedup: ahash, dhash or phash"),
+    max_distance: int = Query(config.IMAGE_DEDUP_MAX_DISTANCE, description="Hamming distance (bits of 64) treated as duplicate"),
+    features: bool = Query(False, description="Include features.parquet with color, brightness, contrast and aspect features")
 ):
-    """Download images as ZIP file"""
+    """Download images as ZIP file, optionally resized and re-encoded"""
     try:
+        processing = None
+        if width or height or image_format:
+            processing = {"width": width, "height": height, "fit": fit,
+                          "image_format": (image_format or "jpeg").lower(), "quality": quality}
+            error = validate_image_options(width, height, fit, processing["image_format"], quality)
+            if error:
+                raise HTTPException(status_code=400, detail=error)
+        if dedup and hash_type not in HASH_TYPES:
+            raise HTTPException(status_code=400, detail=f"hash_type must be one of {', '.join(HASH_TYPES)}")
+        
         # Get image data
         data = image_service.search_photos(query, per_page, orientation=orientation)
         if "error" in data:
@@ -238,14 +546,19 @@ async def download_images_zip(
         if not photos:
             raise HTTPException(status_code=400, detail="No images available")
         
-        # Extract image URLs
-        image_urls = [photo.get("src", {}).get("original", "") for photo in photos if photo.get("src", {}).get("original")]
+        # Extract image URLs, keyed for the blob cache by photo id
+        photos = [photo for photo in photos if photo.get("src", {}).get("original")]
+        image_urls = [photo["src"]["original"] for photo in photos]
+        cache_keys = [(photo["id"], "original") if photo.get("id") else None for photo in photos]
         
         if not image_urls:
             raise HTTPException(status_code=400, detail="No valid image URLs found")
         
         # Create ZIP file
-        file_path = download_images(image_urls, f"images_{query.replace(' ', '_')}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip")
+        file_path = download_images(image_urls, f"images_{query.replace(' ', '_')}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip",
+                                    processing, config.IMAGE_PROCESS_WORKERS,
+                                    max_distance if dedup else None, hash_type,
+                                    min(per_page, config.IMAGE_ZIP_MAX_IMAGES), cache_keys, features)
         
         # Return file response
         return FileResponse(
@@ -255,6 +568,181 @@ async def download_images_zip(
             background=lambda: cleanup_temp_file(file_path)
         )
     
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/images/dataset/{job_id}/zip")
+async def download_image_dataset_zip(
+    job_id: str = Path(..., description="Image dataset job ID")
+):
+    """Download the images of a dataset job with its manifest as a ZIP file"""
+    try:
+        status = image_dataset_builder.get_status(job_id)
+        if "error" in status:
+            raise HTTPException(status_code=404, detail=status["error"])
+        
+        manifest = image_dataset_builder.load_manifest(job_id)
+        if manifest.empty:
+            raise HTTPException(status_code=400, detail="No images downloaded yet")
+        
+        # Images are already compressed, so store them without recompressing
+        file_path = create_temp_file(".zip")
+        with zipfile.ZipFile(file_path, "w", compression=zipfile.ZIP_STORED) as zip_file:
+            for relative_path in manifest["file_path"]:
+                zip_file.write(image_dataset_builder.base_dir / job_id / relative_path, relative_path)
+            zip_file.writestr("manifest.csv", manifest.to_csv(index=False))
+            features_path = image_dataset_builder.base_dir / job_id / "features.parquet"
+            if features_path.exists():
+                zip_file.write(features_path, "features.parquet")
+        
+        # Return file response
+        return FileResponse(
+            path=file_path,
+            filename=f"image_dataset_{job_id}.zip",
+            media_type="application/zip",
+            background=lambda: cleanup_temp_file(file_path)
+        )
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/images/dataset/{job_id}/manifest")
+async def download_image_dataset_manifest(
+    job_id: str = Path(..., description="Image dataset job ID"),
+    file_format: str = Query("csv", alias="format", description="csv or parquet")
+):
+    """Download the labelled manifest of a dataset job"""
+    try:
+        status = image_dataset_builder.get_status(job_id)
+        if "error" in status:
+            raise HTTPException(status_code=404, detail=status["error"])
+        
+        manifest = image_dataset_builder.load_manifest(job_id)
+        if manifest.empty:
+            raise HTTPException(status_code=400, detail="No images downloaded yet")
+        
+        rows = manifest.to_dict(orient="records")
+        if file_format == "parquet":
+            file_path = save_to_parquet(rows, f"image_manifest_{job_id}.parquet")
+            media_type = "application/octet-stream"
+        else:
+            file_path = save_to_csv(rows, f"image_manifest_{job_id}.csv")
+            media_type = "text/csv"
+        
+        # Return file response
+        return FileResponse(
+            path=file_path,
+            filename=f"image_manifest_{job_id}.{'parquet' if file_format == 'parquet' else 'csv'}",
+            media_type=media_type,
+            background=lambda: cleanup_temp_file(file_path)
+        )
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/images/dataset/{job_id}/features")
+async def download_image_dataset_features(
+    job_id: str = Path(..., description="Image dataset job ID"),
+    file_format: str = Query("parquet", alias="format", description="parquet or csv")
+):
+    """Download the pixel feature table of a dataset job started with features"""
+    try:
+        status = image_dataset_builder.get_status(job_id)
+        if "error" in status:
+            raise HTTPException(status_code=404, detail=status["error"])
+        
+        table = image_dataset_builder.load_features(job_id)
+        if table is None:
+            raise HTTPException(status_code=400, detail="Features not extracted for this job")
+        
+        rows = table.to_dict(orient="records")
+        if file_format == "csv":
+            file_path = save_to_csv(rows, f"image_features_{job_id}.csv")
+            media_type = "text/csv"
+        else:
+            file_path = save_to_parquet(rows, f"image_features_{job_id}.parquet")
+            media_type = "application/octet-stream"
+        
+        # Return file response
+        return FileResponse(
+            path=file_path,
+            filename=f"image_features_{job_id}.{'csv' if file_format == 'csv' else 'parquet'}",
+            media_type=media_type,
+            background=lambda: cleanup_temp_file(file_path)
+        )
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/images/dataset/{job_id}/shards/{shard_name}")
+async def download_image_dataset_shard(
+    job_id: str = Path(..., description="Image dataset job ID"),
+    shard_name: str = Path(..., description="Shard file name, e.g. shard-000000.tar")
+):
+    """Download one WebDataset-style tar shard of a dataset job"""
+    try:
+        shard_path = image_dataset_builder.shard_path(job_id, shard_name)
+        if shard_path is None or not shard_path.exists():
+            raise HTTPException(status_code=404, detail=f"Shard '{shard_name}' not found")
+        
+        # Shards live in the job directory, so they are not cleaned up after sending
+        return FileResponse(
+            path=shard_path,
+            filename=f"image_dataset_{job_id}_{shard_name}",
+            media_type="application/x-tar"
+        )
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/videos/zip")
+async def download_videos_zip(
+    query: str = Query(..., description="Search query"),
+    per_page: int = Query(10, description="Number of videos"),
+    page: int = Query(1, description="Page number"),
+    orientation: Optional[str] = Query(None, description="landscape, portrait or square"),
+    min_duration: Optional[int] = Query(None, description="Minimum duration in seconds"),
+    max_duration: Optional[int] = Query(None, description="Maximum duration in seconds"),
+    quality: Optional[str] = Query("hd", description="Preferred rendition: uhd, hd or sd"),
+    max_width: Optional[int] = Query(None, description="Widest rendition to download")
+):
+    """Download videos as a streamed ZIP file with a manifest.
+    Files are downloaded in parallel and archived as each one completes.
+    """
+    try:
+        if quality and quality not in VIDEO_QUALITIES:
+            raise HTTPException(status_code=400, detail=f"quality must be one of {', '.join(VIDEO_QUALITIES)}")
+        if not 1 <= per_page <= config.VIDEO_EXPORT_MAX_VIDEOS:
+            raise HTTPException(status_code=400, detail=f"per_page must be between 1 and {config.VIDEO_EXPORT_MAX_VIDEOS}")
+        
+        data = image_service.get_videos(query, per_page, page, orientation,
+                                        min_duration=min_duration, max_duration=max_duration)
+        if "error" in data:
+            raise HTTPException(status_code=400, detail=data["error"])
+        
+        planned = video_exporter.plan(data.get("videos", []), quality, max_width)
+        if not planned:
+            raise HTTPException(status_code=400, detail="No downloadable videos found")
+        
+        filename = f"videos_{query.replace(' ', '_')}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
+        return StreamingResponse(
+            video_exporter.stream_zip(planned),
+            media_type="application/zip",
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+        )
+    
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -314,6 +802,73 @@ async def download_covid_json(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _read_covid_series(country: str, start: Optional[str], end: Optional[str]):
+    """Parse the requested range and read daily counts with derived metrics from the local store"""
+    try:
+        start_date = date.fromisoformat(start) if start else None
+        end_date = date.fromisoformat(end) if end else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="start and end must be YYYY-MM-DD dates")
+    
+    data = covid_series_store.get_metrics(country, start_date, end_date)
+    if "error" in data:
+        raise HTTPException(status_code=400, detail=data["error"])
+    if data["metrics"].empty:
+        raise HTTPException(status_code=400, detail="No COVID-19 data in this range")
+    return data["slug"], data["metrics"]
+
+@router.get("/covid/series/{country}/csv")
+async def download_covid_series_csv(
+    country: str = Path(..., description="Country slug, ISO2 code or name, or 'world'"),
+    start: Optional[str] = Query(None, description="Start date YYYY-MM-DD"),
+    end: Optional[str] = Query(None, description="End date YYYY-MM-DD")
+):
+    """Download daily COVID-19 counts with derived metrics as CSV"""
+    try:
+        slug, series = _read_covid_series(country, start, end)
+        
+        # Create CSV file
+        file_path = save_to_csv(series.to_dict(orient="records"), f"covid_series_{slug}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
+        
+        # Return file response
+        return FileResponse(
+            path=file_path,
+            filename=f"covid_series_{slug}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+            media_type="text/csv",
+            background=lambda: cleanup_temp_file(file_path)
+        )
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/covid/series/{country}/parquet")
+async def download_covid_series_parquet(
+    country: str = Path(..., description="Country slug, ISO2 code or name, or 'world'"),
+    start: Optional[str] = Query(None, description="Start date YYYY-MM-DD"),
+    end: Optional[str] = Query(None, description="End date YYYY-MM-DD")
+):
+    """Download daily COVID-19 counts with derived metrics as Parquet"""
+    try:
+        slug, series = _read_covid_series(country, start, end)
+        
+        # Create Parquet file
+        file_path = save_to_parquet(series.to_dict(orient="records"), f"covid_series_{slug}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.parquet")
+        
+        # Return file response
+        return FileResponse(
+            path=file_path,
+            filename=f"covid_series_{slug}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.parquet",
+            media_type="application/octet-stream",
+            background=lambda: cleanup_temp_file(file_path)
+        )
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/combined/csv")
 async def download_combined_csv(
     weather_city: Optional[str] = Query(None, description="City for weather data"),
@@ -4,10 +4,16 @@ Handles stock market data requests
 """
 
 import requests
-from typing import Dict, Any, Optional
+import numpy as np
+from typing import Dict, Any, Optional, List
 from config.config import config
+from app.utils.cache import TTLCache
 from app.utils.helpers import handle_api_error
 
+# USD legs are shared by every service instance so the matrix endpoint
+# never refetches a pair another request already paid for
+_usd_rate_cache = TTLCache(ttl=config.FOREX_CACHE_TTL)
+
 class AlphaVantageService:
     """Service for Alpha Vantage API integration"""
     
@@ -181,3 +187,74 @@ class AlphaVantageService:
             return handle_api_error(e, "Alpha Vantage")
         except Exception as e:
             return handle_api_error(e, "Alpha Vantage")
+    
+    def get_usd_rate(self, currency: str) -> Dict[str, Any]:
+        """Get the USD -> currency rate, served from the shared cache when fresh"""
+        currency = currency.upper()
+        if currency == "USD":
+            return {"currency": "USD", "rate": 1.0, "cached": True}
+        
+        cached_rate = _usd_rate_cache.get(currency)
+        if cached_rate is not None:
+            return {"currency": currency, "rate": cached_rate, "cached": True}
+        
+        data = self.get_forex_rates("USD", currency)
+        if "error" in data:
+            return data
+        
+        quote = data.get("Realtime Currency Exchange Rate")
+        if not quote:
+            # Alpha Vantage reports bad symbols and throttling with HTTP 200
+            message = data.get("Error Message") or data.get("Note") or data.get("Information")
+            return {"error": f"No exchange rate for USD/{currency}", "message": message}
+        
+        try:
+            rate = float(quote.get("5. Exchange Rate", 0))
+        except (TypeError, ValueError):
+            rate = 0.0
+        if rate <= 0:
+            return {"error": f"Invalid exchange rate for USD/{currency}"}
+        
+        _usd_rate_cache.set(currency, rate)
+        return {"currency": currency, "rate": rate, "cached": False}
+    
+    def get_forex_matrix(self, currencies: List[str]) -> Dict[str, Any]:
+        """Get an N x N cross-rate matrix derived from the USD legs only.
+        matrix[i][j] is the amount of currencies[j] bought by one unit of currencies[i].
+        """
+        try:
+            if not self.api_key:
+                return {"error": "Alpha Vantage API key not configured"}
+            
+            codes = []
+            for currency in currencies:
+                code = currency.strip().upper()
+                if code and code not in codes:
+                    codes.append(code)
+            
+            if len(codes) < 2:
+                return {"error": "At least two distinct currencies must be specified"}
+            
+            usd_rates = []
+            upstream_calls = 0
+            for code in codes:
+                leg = self.get_usd_rate(code)
+                if "error" in leg:
+                    return leg
+                if not leg["cached"]:
+                    upstream_calls += 1
+                usd_rates.append(leg["rate"])
+            
+            # cross(i, j) = (USD -> j) / (USD -> i), for every pair at once
+            usd_vector = np.asarray(usd_rates, dtype=np.float64)
+            matrix = np.outer(1.0 / usd_vector, usd_vector)
+            
+            return {
+                "currencies": codes,
+                "matrix": matrix.round(8).tolist(),
+                "usd_rates": dict(zip(codes, usd_rates)),
+                "upstream_calls": upstream_calls
+            }
+            
+        except Exception as e:
+            return handle_api_error(e, "Alpha Vantage")
@@ -0,0 +1,138 @@
+"""
+Article full-text service
+Fetches article pages concurrently with per-domain politeness and a total
+deadline, extracting and caching the main body text by URL
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+import requests
+from config.config import config
+from app.utils.cache import TTLCache
+from app.utils.helpers import canonicalize_url
+from app.utils.text_utils import extract_main_text
+
+USER_AGENT = "SmartDatasetGenerator/1.0 (+article text export)"
+
+# Shared so repeated exports of the same articles are served from memory;
+# entries and text length are both capped, which bounds memory use
+_article_text_cache = TTLCache(ttl=config.ARTICLE_TEXT_CACHE_TTL, max_entries=config.ARTICLE_TEXT_CACHE_SIZE)
+
+class ArticleTextService:
+    """Fetches and extracts full article text for news exports"""
+    
+    def __init__(self):
+        self.concurrency = config.ARTICLE_TEXT_CONCURRENCY
+        self.domain_delay = config.ARTICLE_TEXT_DOMAIN_DELAY
+        self.deadline = config.ARTICLE_TEXT_DEADLINE
+        self.max_bytes = config.ARTICLE_TEXT_MAX_BYTES
+        self.max_chars = config.ARTICLE_TEXT_MAX_CHARS
+        self._domain_slots: Dict[str, Dict[str, Any]] = {}
+        self._domain_lock = threading.Lock()
+    
+    def add_full_text(self, articles: List[Dict[str, Any]], deadline: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Return formatted articles with full_text and full_text_status columns.
+        Pages still pending when the deadline expires are reported as 'timeout'.
+        """
+        results = self.fetch_texts([article.get("url", "") for article in articles], deadline)
+        enriched = []
+        for article in articles:
+            text, status = results.get(article.get("url", ""), ("", "skipped"))
+            enriched.append({**article, "full_text": text, "full_text_status": status})
+        return enriched
+    
+    def fetch_texts(self, urls: List[str], deadline: Optional[float] = None) -> Dict[str, Tuple[str, str]]:
+        """Fetch many URLs within a total deadline; returns url -> (text, status)"""
+        expires_at = time.monotonic() + (deadline or self.deadline)
+        results: Dict[str, Tuple[str, str]] = {}
+        pending: Dict[str, List[str]] = {}
+        
+        for url in dict.fromkeys(url for url in urls if url):
+            key = canonicalize_url(url)
+            cached = _article_text_cache.get(key)
+            if cached is not None:
+                results[url] = (cached, "cached")
+            else:
+                pending.setdefault(urlsplit(key).hostname or "", []).append(url)
+        
+        if not pending:
+            return results
+        
+        # Interleave domains so workers are not all queued behind one slow site
+        ordered = []
+        queues = list(pending.values())
+        for position in range(max(len(queue) for queue in queues)):
+            ordered.extend(queue[position] for queue in queues if position < len(queue))
+        
+        executor = ThreadPoolExecutor(max_workers=min(self.concurrency, len(ordered)))
+        futures = {executor.submit(self._fetch_one, url, expires_at): url for url in ordered}
+        done, _ = wait(futures, timeout=max(0.0, expires_at - time.monotonic()))
+        executor.shutdown(wait=False, cancel_futures=True)
+        
+        for future, url in futures.items():
+            results[url] = future.result() if future in done else ("", "timeout")
+        return results
+    
+    def _fetch_one(self, url: str, expires_at: float) -> Tuple[str, str]:
+        """Fetch and extract one page, respecting the per-domain delay and the deadline"""
+        try:
+            key = canonicalize_url(url)
+            if not self._wait_for_domain(urlsplit(key).hostname or "", expires_at):
+                return "", "timeout"
+            
+            remaining = expires_at - time.monotonic()
+            with requests.get(url, headers={"User-Agent": USER_AGENT}, stream=True,
+                              timeout=min(10.0, max(1.0, remaining))) as response:
+                response.raise_for_status()
+                if "html" not in response.headers.get("Content-Type", "text/html"):
+                    return "", "not_html"
+                
+                # Stop reading oversized pages instead of buffering them whole
+                chunks, size = [], 0
+                for chunk in response.iter_content(chunk_size=65536):
+                    chunks.append(chunk)
+                    size += len(chunk)
+                    if size >= self.max_bytes or time.monotonic() > expires_at:
+                        break
+                # requests assumes ISO-8859-1 when no charset is declared; most pages are UTF-8
+                encoding = response.encoding if "charset" in response.headers.get("Content-Type", "") else "utf-8"
+                html = b"".join(chunks).decode(encoding or "utf-8", errors="replace")
+            
+            text = extract_main_text(html)[:self.max_chars]
+            if not text:
+                return "", "no_text"
+            _article_text_cache.set(key, text)
+            return text, "ok"
+        
+        except requests.exceptions.RequestException as e:
+            return "", f"error: {type(e).__name__}"
+        except Exception as e:
+            return "", f"error: {e}"
+    
+    def _wait_for_domain(self, domain: str, expires_at: float) -> bool:
+        """Space requests to one domain by domain_delay; False if the slot falls after the deadline"""
+        with self._domain_lock:
+            slot = self._domain_slots.get(domain)
+            if slot is None:
+                # Forget domains nobody is waiting on whose delay has passed, so the map stays bounded
+                now = time.monotonic()
+                for idle in [name for name, entry in self._domain_slots.items() if not entry["users"] and entry["next_at"] <= now]:
+                    del self._domain_slots[idle]
+                slot = self._domain_slots[domain] = {"lock": threading.Lock(), "next_at": 0.0, "users": 0}
+            slot["users"] += 1
+        
+        try:
+            with slot["lock"]:
+                start_at = max(time.monotonic(), slot["next_at"])
+                if start_at >= expires_at:
+                    return False
+                slot["next_at"] = start_at + self.domain_delay
+        finally:
+            with self._domain_lock:
+                slot["users"] -= 1
+        
+        time.sleep(max(0.0, start_at - time.monotonic()))
+        return True
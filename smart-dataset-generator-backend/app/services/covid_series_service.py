@@ -0,0 +1,247 @@
+"""
+COVID-19 time-series store
+Keeps one Parquet table of daily cumulative counts per country, filled by
+parallel date-window fetches, and derives daily, rolling, growth and
+per-capita metrics from local data
+"""
+
+import json
+import threading
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from config.config import config
+from app.services.covid_service import COVIDService
+from app.utils.helpers import run_concurrently
+
+POPULATION_FILE = Path(__file__).resolve().parent.parent / "data" / "country_population.csv"
+WORLD_POPULATION = 7794798739
+SERIES_START = date(2020, 1, 22)
+COUNT_COLUMNS = ["confirmed", "deaths", "recovered", "active"]
+
+class CovidSeriesStore:
+    """Per-country daily series in columnar storage; only missing date windows are fetched"""
+    
+    def __init__(self, covid_service: Optional[COVIDService] = None):
+        self.covid_service = covid_service or COVIDService()
+        self.store_dir = Path(config.COVID_SERIES_DIR)
+        self.window_days = config.COVID_SERIES_WINDOW_DAYS
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+        population = pd.read_csv(POPULATION_FILE, keep_default_na=False)
+        self.populations: Dict[str, int] = dict(zip(population["iso2"], population["population"]))
+    
+    def get_metrics(self, country: str, start: Optional[date] = None, end: Optional[date] = None) -> Dict[str, Any]:
+        """Daily counts with derived metrics for start..end (inclusive), syncing missing days first"""
+        start = max(start or SERIES_START, SERIES_START)
+        end = min(end or date.today(), date.today())
+        if start > end:
+            return {"error": "start must not be after end"}
+        
+        resolved = self.resolve_country(country)
+        if "error" in resolved:
+            return resolved
+        
+        # Rolling windows and week-over-week growth look back 14 days
+        sync = self.sync(resolved, start - timedelta(days=14), end)
+        series = self.load(resolved["slug"])
+        if series.empty and sync["window_errors"]:
+            return {"error": next(iter(sync["window_errors"].values()))}
+        
+        metrics = derive_metrics(series, resolved["population"], self._load_coverage(resolved["slug"]))
+        mask = (metrics["date"] >= pd.Timestamp(start)) & (metrics["date"] <= pd.Timestamp(end))
+        return {
+            **resolved,
+            "metrics": metrics[mask].reset_index(drop=True),
+            "windows_fetched": sync["windows_fetched"],
+            "window_errors": sync["window_errors"]
+        }
+    
+    def resolve_country(self, country: str) -> Dict[str, Any]:
+        """Map a slug, ISO2 code or name to the API slug and a population figure"""
+        if country.strip().lower() == "world":
+            return {"slug": "world", "country": "World", "iso2": "", "population": WORLD_POPULATION}
+        
+        summary = self.covid_service.get_country_summary(country)
+        if "error" in summary:
+            if "not found" in summary["error"]:
+                return summary
+            # Summary unavailable: assume the caller passed a slug
+            summary = {"Slug": country.strip().lower(), "Country": country, "CountryCode": country.strip().upper()}
+        
+        return {
+            "slug": summary["Slug"],
+            "country": summary.get("Country", ""),
+            "iso2": summary.get("CountryCode", ""),
+            "population": self.populations.get(summary.get("CountryCode", ""))
+        }
+    
+    def sync(self, resolved: Dict[str, Any], start: date, end: date) -> Dict[str, Any]:
+        """Fetch every uncovered day between start and end in parallel windows and merge them"""
+        slug = resolved["slug"]
+        with self._locks_lock:
+            lock = self._locks.setdefault(slug, threading.Lock())
+        
+        # One sync per country at a time; a waiting request then finds the days covered
+        with lock:
+            coverage = self._load_coverage(slug)
+            windows = self._missing_windows(coverage, max(start, SERIES_START), end)
+            if not windows:
+                return {"windows_fetched": 0, "window_errors": {}}
+            
+            results = run_concurrently(lambda window: self._fetch_window(slug, *window), windows,
+                                       config.COVID_SERIES_CONCURRENCY)
+            
+            frames, errors = [], {}
+            for (window_start, window_end), (frame, error) in zip(windows, results):
+                label = f"{window_start.isoformat()}..{window_end.isoformat()}"
+                if error:
+                    errors[label] = error
+                    continue
+                frames.append(frame)
+                # Recent days are still being revised upstream, so they stay uncovered
+                settled_end = min(window_end, date.today() - timedelta(days=2))
+                if settled_end >= window_start:
+                    coverage.append([window_start.isoformat(), settled_end.isoformat()])
+            
+            if frames:
+                self._merge(slug, frames)
+                self._write_coverage(slug, coverage)
+            return {"windows_fetched": len(windows), "window_errors": errors}
+    
+    def load(self, slug: str) -> pd.DataFrame:
+        """The stored daily series for one country, sorted by date"""
+        path = self.store_dir / f"{slug}.parquet"
+        if not path.exists():
+            return pd.DataFrame(columns=["date"] + COUNT_COLUMNS)
+        return pd.read_parquet(path)
+    
+    def _fetch_window(self, slug: str, start: date, end: date) -> Tuple[Optional[pd.DataFrame], Optional[str]]:
+        """Fetch one date window and reduce it to one row of cumulative counts per day"""
+        from_date, to_date = f"{start.isoformat()}T00:00:00Z", f"{end.isoformat()}T23:59:59Z"
+        if slug == "world":
+            data = self.covid_service.get_world_data_by_date(from_date, to_date)
+        else:
+            data = self.covid_service.get_country_data_by_date(slug, from_date, to_date)
+        if isinstance(data, dict):
+            return None, data.get("message") or data.get("error") or data.get("Message") or "Unexpected response"
+        
+        frame = pd.DataFrame(data)
+        if frame.empty:
+            return pd.DataFrame(columns=["date"] + COUNT_COLUMNS), None
+        if slug == "world":
+            frame = frame.rename(columns={"TotalConfirmed": "Confirmed", "TotalDeaths": "Deaths", "TotalRecovered": "Recovered"})
+            frame["Active"] = frame["Confirmed"] - frame["Deaths"] - frame["Recovered"]
+        
+        frame["date"] = pd.to_datetime(frame["Date"]).dt.tz_localize(None).dt.normalize()
+        frame = frame.rename(columns={"Confirmed": "confirmed", "Deaths": "deaths", "Recovered": "recovered", "Active": "active"})
+        for column in COUNT_COLUMNS:
+            frame[column] = pd.to_numeric(frame[column], errors="coerce").fillna(0).astype("int64") if column in frame else 0
+        
+        # Countries reported by province have no national row; sum provinces for those days
+        province = frame["Province"].fillna("") if "Province" in frame else pd.Series("", index=frame.index)
+        national = frame[province == ""]
+        provinces = frame[(province != "") & ~frame["date"].isin(national["date"])]
+        daily = pd.concat([
+            national.groupby("date", as_index=False)[COUNT_COLUMNS].max(),
+            provinces.groupby("date", as_index=False)[COUNT_COLUMNS].sum()
+        ], ignore_index=True)
+        return daily, None
+    
+    def _merge(self, slug: str, frames: List[pd.DataFrame]) -> None:
+        """Merge fetched days into the stored table (new rows win) and rewrite it atomically"""
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        merged = pd.concat([self.load(slug)] + frames, ignore_index=True)
+        merged["date"] = pd.to_datetime(merged["date"])
+        merged = merged.drop_duplicates("date", keep="last").sort_values("date").reset_index(drop=True)
+        merged[COUNT_COLUMNS] = merged[COUNT_COLUMNS].astype("int64")
+        
+        path = self.store_dir / f"{slug}.parquet"
+        temp_path = path.with_suffix(".tmp")
+        merged.to_parquet(temp_path, index=False)
+        temp_path.replace(path)
+    
+    def _missing_windows(self, coverage: List[List[str]], start: date, end: date) -> List[Tuple[date, date]]:
+        """Split the uncovered days of start..end into windows of at most window_days"""
+        covered = np.zeros((end - start).days + 1, dtype=bool)
+        for covered_start, covered_end in coverage:
+            first = max((date.fromisoformat(covered_start) - start).days, 0)
+            last = min((date.fromisoformat(covered_end) - start).days, len(covered) - 1)
+            if first <= last:
+                covered[first:last + 1] = True
+        
+        windows = []
+        offset = 0
+        while offset < len(covered):
+            if covered[offset]:
+                offset += 1
+                continue
+            run_end = offset
+            while run_end + 1 < len(covered) and not covered[run_end + 1] and run_end + 1 - offset < self.window_days:
+                run_end += 1
+            windows.append((start + timedelta(days=offset), start + timedelta(days=run_end)))
+            offset = run_end + 1
+        return windows
+    
+    def _load_coverage(self, slug: str) -> List[List[str]]:
+        """Date ranges already fetched for a country"""
+        path = self.store_dir / f"{slug}.coverage.json"
+        if not path.exists():
+            return []
+        return json.loads(path.read_text(encoding="utf-8"))
+    
+    def _write_coverage(self, slug: str, coverage: List[List[str]]) -> None:
+        """Atomically write the fetched date ranges, merging overlapping ones"""
+        merged: List[List[str]] = []
+        for covered_start, covered_end in sorted(coverage):
+            next_day = (date.fromisoformat(merged[-1][1]) + timedelta(days=1)).isoformat() if merged else None
+            if merged and covered_start <= next_day:
+                merged[-1][1] = max(merged[-1][1], covered_end)
+            else:
+                merged.append([covered_start, covered_end])
+        
+        path = self.store_dir / f"{slug}.coverage.json"
+        temp_path = path.with_suffix(".tmp")
+        temp_path.write_text(json.dumps(merged), encoding="utf-8")
+        temp_path.replace(path)
+
+def derive_metrics(series: pd.DataFrame, population: Optional[int], coverage: List[List[str]]) -> pd.DataFrame:
+    """Add daily deltas, 7-day averages, growth rates and per-100k rates as vectorized columns.
+    Missing calendar days inside covered date ranges are filled forward so deltas
+    are one day apart; days no successful fetch covered stay empty instead of
+    repeating stale counts.
+    """
+    if series.empty:
+        return pd.DataFrame(columns=["date"] + COUNT_COLUMNS)
+    
+    reported = series.set_index("date")[COUNT_COLUMNS].asfreq("D").astype("float64")
+    covered = pd.Series(False, index=reported.index)
+    for covered_start, covered_end in coverage:
+        covered[pd.Timestamp(covered_start):pd.Timestamp(covered_end)] = True
+    daily = reported.ffill().where(reported.notna().all(axis=1) | covered, axis=0)
+    
+    for column in ("confirmed", "deaths", "recovered"):
+        # Negative deltas are upstream corrections and are kept as reported
+        daily[f"new_{column}"] = daily[column].diff()
+        daily[f"new_{column}_7d_avg"] = daily[f"new_{column}"].rolling(7, min_periods=7).mean().round(2)
+    
+    daily["confirmed_growth_rate"] = (daily["confirmed"].pct_change(fill_method=None)
+                                      .replace([np.inf, -np.inf], np.nan).round(6))
+    daily["new_confirmed_7d_growth"] = (daily["new_confirmed_7d_avg"].pct_change(7, fill_method=None)
+                                        .replace([np.inf, -np.inf], np.nan).round(6))
+    daily["case_fatality_rate"] = (daily["deaths"] / daily["confirmed"].where(daily["confirmed"] > 0)).round(6)
+    
+    if population:
+        scale = 100000 / population
+        for column in ("confirmed", "deaths", "new_confirmed_7d_avg", "new_deaths_7d_avg"):
+            daily[f"{column}_per_100k"] = (daily[column] * scale).round(4)
+    
+    # Nullable integers keep counts whole while uncovered gaps stay missing
+    counts = COUNT_COLUMNS + ["new_confirmed", "new_deaths", "new_recovered"]
+    daily[counts] = daily[counts].astype("Int64")
+    return daily.reset_index()
+
+# Shared so concurrent requests for one country sync it once
+covid_series_store = CovidSeriesStore()
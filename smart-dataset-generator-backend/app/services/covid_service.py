@@ -3,18 +3,95 @@ COVID-19 API service
 Handles COVID-19 data requests
 """
 
+import re
+import threading
 import requests
 from typing import Dict, Any, Optional, List
 from datetime import datetime, timedelta
 from config.config import config
+from app.utils.cache import TTLCache
 from app.utils.helpers import handle_api_error
 
+RANKING_METRICS = ("TotalConfirmed", "TotalDeaths", "TotalRecovered", "NewConfirmed", "NewDeaths", "NewRecovered")
+
+# One summary snapshot shared by the global, country and top-N endpoints
+_summary_cache = TTLCache(ttl=config.COVID_SUMMARY_CACHE_TTL, max_entries=1)
+_summary_lock = threading.Lock()
+
+def _country_key(value: str) -> str:
+    """Normalize a country slug, ISO2 code or name for lookups"""
+    return re.sub(r"[^a-z0-9]+", "-", value.strip().lower()).strip("-")
+
+class SummarySnapshot:
+    """A /summary response indexed by country and ranked once per metric"""
+    
+    def __init__(self, summary: Dict[str, Any]):
+        self.summary = summary
+        self.countries: List[Dict[str, Any]] = summary.get("Countries") or []
+        self.index: Dict[str, Dict[str, Any]] = {}
+        for country in self.countries:
+            for value in (country.get("Slug"), country.get("CountryCode"), country.get("Country")):
+                if value:
+                    self.index.setdefault(_country_key(value), country)
+        
+        # Sorted once per snapshot, so top-N requests are a slice
+        self.rankings: Dict[str, List[Dict[str, Any]]] = {
+            metric: sorted(self.countries, key=lambda country: country.get(metric) or 0, reverse=True)
+            for metric in RANKING_METRICS
+        }
+    
+    def find(self, country: str) -> Optional[Dict[str, Any]]:
+        """Country entry by slug, ISO2 code or name (case-insensitive)"""
+        return self.index.get(_country_key(country))
+
 class COVIDService:
     """Service for COVID-19 API integration"""
     
     def __init__(self):
         self.base_url = config.COVID_API_BASE_URL
     
+    def get_summary_snapshot(self, refresh: bool = False) -> Any:
+        """Get the cached summary snapshot, fetching it once when missing or expired.
+        Returns an error dict when the upstream call fails.
+        """
+        snapshot = None if refresh else _summary_cache.get("summary")
+        if snapshot is not None:
+            return snapshot
+        
+        # Concurrent requests wait for a single upstream fetch
+        with _summary_lock:
+            snapshot = None if refresh else _summary_cache.get("summary")
+            if snapshot is not None:
+                return snapshot
+            
+            summary = self.get_global_summary()
+            if "error" in summary:
+                return summary
+            if not summary.get("Countries"):
+                return {"error": summary.get("Message") or "No country data available"}
+            
+            snapshot = SummarySnapshot(summary)
+            _summary_cache.set("summary", snapshot)
+            return snapshot
+    
+    def get_cached_summary(self) -> Dict[str, Any]:
+        """Get the global COVID-19 summary from the shared snapshot"""
+        snapshot = self.get_summary_snapshot()
+        if isinstance(snapshot, dict):
+            return snapshot
+        return snapshot.summary
+    
+    def get_country_summary(self, country: str) -> Dict[str, Any]:
+        """Get one country's summary entry by slug, ISO2 code or name"""
+        snapshot = self.get_summary_snapshot()
+        if isinstance(snapshot, dict):
+            return snapshot
+        
+        entry = snapshot.find(country)
+        if entry is None:
+            return {"error": f"Country '{country}' not found"}
+        return {**entry, "Global": snapshot.summary.get("Global", {}), "last_updated": snapshot.summary.get("Date", "")}
+    
     def get_global_summary(self) -> Dict[str, Any]:
         """Get global COVID-19 summary"""
         try:
@@ -147,28 +224,21 @@ class COVIDService:
         except Exception as e:
             return handle_api_error(e, "COVID-19 API")
     
-    def get_top_countries_by_cases(self, limit: int = 10) -> Dict[str, Any]:
-        """Get top countries by total cases"""
+    def get_top_countries_by_cases(self, limit: int = 10, metric: str = "TotalConfirmed") -> Dict[str, Any]:
+        """Get top countries by a summary metric (total cases by default)"""
         try:
-            summary = self.get_global_summary()
-            if "error" in summary:
-                return summary
-            
-            countries = summary.get("Countries", [])
-            if not countries:
-                return {"error": "No country data available"}
+            if metric not in RANKING_METRICS:
+                return {"error": f"metric must be one of {', '.join(RANKING_METRICS)}"}
             
-            # Sort by total confirmed cases
-            sorted_countries = sorted(
-                countries, 
-                key=lambda x: x.get("TotalConfirmed", 0), 
-                reverse=True
-            )
+            snapshot = self.get_summary_snapshot()
+            if isinstance(snapshot, dict):
+                return snapshot
             
             return {
-                "top_countries": sorted_countries[:limit],
-                "total_countries": len(countries),
-                "last_updated": summary.get("Date", "")
+                "metric": metric,
+                "top_countries": snapshot.rankings[metric][:max(0, limit)],
+                "total_countries": len(snapshot.countries),
+                "last_updated": snapshot.summary.get("Date", "")
             }
             
         except Exception as e:
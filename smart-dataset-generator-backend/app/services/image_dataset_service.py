@@ -0,0 +1,347 @@
+"""
+Image dataset builder service
+Pages Pexels search results concurrently per label, downloads the photos
+with bounded concurrency and writes a labelled manifest, optional pixel
+features and optional WebDataset-style tar shards
+"""
+
+import hashlib
+import io
+import json
+import math
+import os
+import tarfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import pandas as pd
+from config.config import config
+from app.services.pexels_service import PexelsService
+from app.utils.blob_cache import image_blob_cache, link_or_copy
+from app.utils.helpers import handle_api_error, run_concurrently
+from app.utils.image_utils import extract_features
+from app.utils.rate_limiter import RateLimiter
+
+PHOTO_VARIANTS = ("original", "large2x", "large", "medium", "small")
+PEXELS_PAGE_SIZE = 80
+
+class ImageDatasetBuilder:
+    """Builds labelled image datasets in background jobs, resumable by job id"""
+    
+    def __init__(self, image_service: Optional[PexelsService] = None):
+        self.image_service = image_service or PexelsService()
+        self.base_dir = Path(config.IMAGE_DATASET_DIR)
+        self.rate_limiter = RateLimiter(config.PEXELS_CALLS_PER_HOUR, per=3600.0)
+        self._running: Dict[str, threading.Thread] = {}
+        self._progress: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+    
+    def start_job(self, queries: List[str], images_per_query: int, variant: str = "large",
+                  orientation: Optional[str] = None, shard_size: Optional[int] = None,
+                  features: bool = False) -> Dict[str, Any]:
+        """Start (or resume) a dataset job. Identical requests map to the same job id.
+        With shard_size, images are also packed into tar shards of that many samples.
+        With features, pixel features are written to features.parquet.
+        """
+        try:
+            if not self.image_service.api_key:
+                return {"error": "Pexels API key not configured"}
+            labels = list(dict.fromkeys(query.strip() for query in queries if query.strip()))
+            if not labels:
+                return {"error": "At least one query must be specified"}
+            if variant not in PHOTO_VARIANTS:
+                return {"error": f"variant must be one of {', '.join(PHOTO_VARIANTS)}"}
+            if images_per_query < 1 or images_per_query * len(labels) > config.IMAGE_DATASET_MAX_IMAGES:
+                return {"error": f"Between 1 and {config.IMAGE_DATASET_MAX_IMAGES} images per dataset"}
+            if shard_size is not None and shard_size < 1:
+                return {"error": "shard_size must be at least 1"}
+            
+            spec = {
+                "queries": labels,
+                "images_per_query": images_per_query,
+                "variant": variant,
+                "orientation": orientation
+            }
+            # Optional stages are only present when requested, so existing jobs keep their ids
+            if shard_size:
+                spec["shard_size"] = shard_size
+            if features:
+                spec["features"] = True
+            job_id = hashlib.sha1(json.dumps(spec, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+            job_dir = self.base_dir / job_id
+            job_dir.mkdir(parents=True, exist_ok=True)
+            
+            spec_path = job_dir / "job.json"
+            if not spec_path.exists():
+                spec["job_id"] = job_id
+                spec["created_at"] = datetime.now().isoformat()
+                spec_path.write_text(json.dumps(spec, indent=2), encoding="utf-8")
+            
+            with self._lock:
+                thread = self._running.get(job_id)
+                if thread is None or not thread.is_alive():
+                    self._progress[job_id] = {"stage": "queued", "errors": {}}
+                    thread = threading.Thread(target=self._run, args=(job_id,), daemon=True)
+                    self._running[job_id] = thread
+                    thread.start()
+            
+            return self.get_status(job_id)
+        
+        except Exception as e:
+            return handle_api_error(e, "Image Dataset")
+    
+    def get_status(self, job_id: str) -> Dict[str, Any]:
+        """Get progress for a job from the files on disk"""
+        spec = self._load_json(job_id, "job.json")
+        if spec is None:
+            return {"error": f"Image dataset job '{job_id}' not found"}
+        
+        photos = self._load_json(job_id, "photos.json") or []
+        downloaded = sum(1 for photo in photos if self.image_path(job_id, photo).exists())
+        thread = self._running.get(job_id)
+        progress = self._progress.get(job_id, {})
+        errors = progress.get("errors", {})
+        
+        return {
+            "job_id": job_id,
+            "running": bool(thread and thread.is_alive()),
+            "stage": progress.get("stage", "idle"),
+            "queries": spec["queries"],
+            "requested": spec["images_per_query"] * len(spec["queries"]),
+            "collected": len(photos),
+            "downloaded": downloaded,
+            "failed": len(errors),
+            "errors": dict(list(errors.items())[:20]),
+            "manifest_ready": (self.base_dir / job_id / "manifest.parquet").exists(),
+            "features_ready": (self.base_dir / job_id / "features.parquet").exists(),
+            "shards": self.list_shards(job_id)
+        }
+    
+    def load_manifest(self, job_id: str) -> pd.DataFrame:
+        """Manifest rows for every downloaded image of a job"""
+        path = self.base_dir / job_id / "manifest.parquet"
+        if path.exists():
+            return pd.read_parquet(path)
+        return pd.DataFrame(self._manifest_rows(job_id))
+    
+    def load_features(self, job_id: str) -> Optional[pd.DataFrame]:
+        """Feature table of a job, or None if features were not extracted"""
+        path = self.base_dir / job_id / "features.parquet"
+        return pd.read_parquet(path) if path.exists() else None
+    
+    def list_shards(self, job_id: str) -> List[Dict[str, Any]]:
+        """Name, sample count and size of each written shard"""
+        return self._load_json(job_id, "shards/index.json") or []
+    
+    def shard_path(self, job_id: str, name: str) -> Optional[Path]:
+        """Path of a shard listed in the job's shard index, or None"""
+        if name not in {shard["name"] for shard in self.list_shards(job_id)}:
+            return None
+        return self.base_dir / job_id / "shards" / name
+    
+    def image_path(self, job_id: str, photo: Dict[str, Any]) -> Path:
+        """Where a photo is stored inside the job directory"""
+        return self.base_dir / job_id / photo["file_path"]
+    
+    def _run(self, job_id: str) -> None:
+        """Collect photo metadata for labels not yet searched cleanly, download missing images, then write the manifest"""
+        progress = self._progress[job_id]
+        try:
+            spec = self._load_json(job_id, "job.json")
+            photos = self._load_json(job_id, "photos.json")
+            searched = self._load_json(job_id, "searched.json")
+            if photos is None:
+                photos, searched = [], []
+            elif searched is None:
+                # Jobs from before per-label tracking searched every label in one go
+                searched = list(spec["queries"])
+            
+            remaining = [label for label in spec["queries"] if label not in searched]
+            if remaining:
+                progress["stage"] = "searching"
+                for label in remaining:
+                    # A label searched again replaces its partial results
+                    photos = [photo for photo in photos if photo["label"] != label]
+                    seen = {photo["id"] for photo in photos}
+                    label_errors: Dict[str, str] = {}
+                    for photo in self._collect(label, spec, label_errors):
+                        # A photo matching several queries keeps its first label
+                        if photo["id"] not in seen:
+                            seen.add(photo["id"])
+                            photos.append(photo)
+                    progress["errors"].update(label_errors)
+                    # Labels whose search hit errors are searched again when the job resumes
+                    if not label_errors:
+                        searched.append(label)
+                self._write_json(job_id, "searched.json", searched)
+                self._write_json(job_id, "photos.json", photos)
+            
+            progress["stage"] = "downloading"
+            pending = [photo for photo in photos if not self.image_path(job_id, photo).exists()]
+            with ThreadPoolExecutor(max_workers=config.IMAGE_DATASET_CONCURRENCY) as executor:
+                for photo in pending:
+                    executor.submit(self._download, job_id, photo, spec["variant"], progress["errors"])
+            
+            progress["stage"] = "writing manifest"
+            manifest = pd.DataFrame(self._manifest_rows(job_id))
+            manifest.to_csv(self.base_dir / job_id / "manifest.csv", index=False)
+            manifest.to_parquet(self.base_dir / job_id / "manifest.parquet", index=False)
+            
+            if spec.get("features"):
+                progress["stage"] = "extracting features"
+                self._write_features(job_id, manifest)
+            
+            if spec.get("shard_size"):
+                progress["stage"] = "writing shards"
+                self._write_shards(job_id, spec["shard_size"])
+            progress["stage"] = "complete"
+        
+        except Exception as e:
+            progress["stage"] = "failed"
+            progress["errors"]["job"] = str(e)
+    
+    def _collect(self, label: str, spec: Dict[str, Any], errors: Dict[str, str]) -> List[Dict[str, Any]]:
+        """Page through search results for one label concurrently until enough photos are found"""
+        wanted = spec["images_per_query"]
+        
+        def fetch_page(page: int) -> Dict[str, Any]:
+            self.rate_limiter.acquire()
+            return self.image_service.search_photos(label, PEXELS_PAGE_SIZE, page, orientation=spec["orientation"])
+        
+        first_page = fetch_page(1)
+        if "error" in first_page:
+            errors[f"{label}/page 1"] = first_page.get("message") or first_page["error"]
+            return []
+        
+        total_results = first_page.get("total_results", 0)
+        last_page = math.ceil(total_results / PEXELS_PAGE_SIZE)
+        page_count = max(1, min(math.ceil(wanted / PEXELS_PAGE_SIZE), last_page))
+        pages = [first_page] + run_concurrently(fetch_page, list(range(2, page_count + 1)), config.IMAGE_DATASET_CONCURRENCY)
+        
+        photos, seen = [], set()
+        while True:
+            for page_number, page in enumerate(pages, start=page_count - len(pages) + 1):
+                if "error" in page:
+                    errors[f"{label}/page {page_number}"] = page.get("message") or page["error"]
+                    continue
+                for photo in page.get("photos", []):
+                    # Results shift between pages while paging, so ids can repeat
+                    if photo.get("id") in seen or len(photos) >= wanted:
+                        continue
+                    seen.add(photo.get("id"))
+                    photos.append(self._photo_record(photo, label, spec["variant"]))
+            
+            # Top up one page at a time when repeats left us short
+            if len(photos) >= wanted or page_count >= last_page:
+                break
+            page_count += 1
+            pages = [fetch_page(page_count)]
+        
+        return photos
+    
+    def _photo_record(self, photo: Dict[str, Any], label: str, variant: str) -> Dict[str, Any]:
+        """Manifest fields for one Pexels photo"""
+        label_dir = "".join(char if char.isalnum() else "_" for char in label.lower()).strip("_") or "unlabelled"
+        return {
+            "id": photo.get("id"),
+            "label": label,
+            "width": photo.get("width"),
+            "height": photo.get("height"),
+            "photographer": photo.get("photographer", ""),
+            "photographer_id": photo.get("photographer_id"),
+            "avg_color": photo.get("avg_color", ""),
+            "alt": photo.get("alt", ""),
+            "page_url": photo.get("url", ""),
+            "source_url": (photo.get("src") or {}).get(variant, ""),
+            "file_path": f"images/{label_dir}/{photo.get('id')}.jpg"
+        }
+    
+    def _download(self, job_id: str, photo: Dict[str, Any], variant: str, errors: Dict[str, str]) -> None:
+        """Fetch one photo through the blob cache and hard-link it into the job directory"""
+        try:
+            blob = image_blob_cache.fetch(photo["id"], variant, photo["source_url"], pin=True)
+            if blob is None:
+                errors[str(photo["id"])] = f"Could not download {photo['source_url']}"
+                return
+            try:
+                link_or_copy(blob, self.image_path(job_id, photo))
+            finally:
+                image_blob_cache.release(blob)
+        except Exception as e:
+            errors[str(photo["id"])] = str(e)
+    
+    def _write_features(self, job_id: str, manifest: pd.DataFrame) -> None:
+        """Extract pixel features for every downloaded image on a process pool into features.parquet"""
+        columns = ["id", "label", "file_path", "width", "height", "avg_color", "alt"]
+        rows = manifest[columns].to_dict(orient="records") if not manifest.empty else []
+        extracted = extract_features([self.image_path(job_id, row) for row in rows], config.IMAGE_PROCESS_WORKERS)
+        table = pd.DataFrame([{**row, **features} for row, features in zip(rows, extracted)])
+        temp_path = self.base_dir / job_id / "features.tmp"
+        table.to_parquet(temp_path, index=False)
+        os.replace(temp_path, self.base_dir / job_id / "features.parquet")
+    
+    def _write_shards(self, job_id: str, shard_size: int) -> None:
+        """Pack downloaded images into tar shards of shard_size samples, written in parallel.
+        Labels are interleaved so every shard holds a mix of classes.
+        """
+        by_label: Dict[str, List[Dict[str, Any]]] = {}
+        for photo in self._manifest_rows(job_id):
+            by_label.setdefault(photo["label"], []).append(photo)
+        queues = list(by_label.values())
+        samples = [queue[position] for position in range(max(map(len, queues), default=0))
+                   for queue in queues if position < len(queue)]
+        
+        shard_dir = self.base_dir / job_id / "shards"
+        shard_dir.mkdir(exist_ok=True)
+        groups = [samples[start:start + shard_size] for start in range(0, len(samples), shard_size)]
+        names = [f"shard-{index:06d}.tar" for index in range(len(groups))]
+        with ThreadPoolExecutor(max_workers=config.IMAGE_DATASET_CONCURRENCY) as executor:
+            sizes = list(executor.map(self._write_shard, [shard_dir / name for name in names], [job_id] * len(groups), groups))
+        
+        # Drop shards left over from an earlier run with more samples
+        for stale in shard_dir.glob("shard-*.tar"):
+            if stale.name not in names:
+                stale.unlink()
+        index = [{"name": name, "samples": len(group), "bytes": size} for name, group, size in zip(names, groups, sizes)]
+        self._write_json(job_id, "shards/index.json", index)
+    
+    def _write_shard(self, path: Path, job_id: str, photos: List[Dict[str, Any]]) -> int:
+        """Write one uncompressed tar with <id>.jpg and <id>.json per sample; returns its size"""
+        temp_path = path.with_suffix(".tmp")
+        with tarfile.open(temp_path, "w", format=tarfile.PAX_FORMAT) as shard:
+            for photo in photos:
+                key = str(photo["id"])
+                # JPEGs are already compressed, so the tar stores them as-is
+                shard.add(self.image_path(job_id, photo), arcname=f"{key}.jpg")
+                
+                metadata = json.dumps(photo).encode("utf-8")
+                info = tarfile.TarInfo(f"{key}.json")
+                info.size = len(metadata)
+                info.mtime = int(datetime.now().timestamp())
+                shard.addfile(info, io.BytesIO(metadata))
+        os.replace(temp_path, path)
+        return path.stat().st_size
+    
+    def _manifest_rows(self, job_id: str) -> List[Dict[str, Any]]:
+        """Photo records whose image file exists"""
+        photos = self._load_json(job_id, "photos.json") or []
+        return [photo for photo in photos if self.image_path(job_id, photo).exists()]
+    
+    def _load_json(self, job_id: str, name: str) -> Optional[Any]:
+        """Load a JSON file from the job directory, or None if missing"""
+        path = self.base_dir / job_id / name
+        if not path.exists():
+            return None
+        return json.loads(path.read_text(encoding="utf-8"))
+    
+    def _write_json(self, job_id: str, name: str, data: Any) -> None:
+        """Atomically write a JSON file into the job directory"""
+        path = self.base_dir / job_id / name
+        temp_path = path.with_suffix(".tmp")
+        temp_path.write_text(json.dumps(data), encoding="utf-8")
+        os.replace(temp_path, path)
+
+# Shared so job state survives across requests
+image_dataset_builder = ImageDatasetBuilder()
@@ -0,0 +1,156 @@
+"""
+News sources catalog service
+Keeps NewsAPI's sources list in memory and on disk, refreshed in the
+background and indexed for local filtering and validation
+"""
+
+import json
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+from config.config import config
+from app.services.newsapi_service import NewsAPIService
+
+class NewsSourcesCatalog:
+    """Indexed snapshot of the NewsAPI sources list"""
+    
+    def __init__(self, news_service: Optional[NewsAPIService] = None):
+        self.news_service = news_service or NewsAPIService()
+        self.snapshot_path = Path(config.NEWS_SOURCES_FILE)
+        self.interval = config.NEWS_SOURCES_REFRESH_INTERVAL
+        self.refreshed_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._sources: Dict[str, Dict[str, Any]] = {}
+        self._by_field: Dict[str, Dict[str, Set[str]]] = {"category": {}, "language": {}, "country": {}}
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self) -> None:
+        """Refresh in a background thread whenever the snapshot is older than the interval"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+    
+    def stop(self) -> None:
+        """Stop the background refresher"""
+        self._stop_event.set()
+    
+    def refresh(self) -> Dict[str, Any]:
+        """Fetch the full sources list (all languages) and replace the snapshot"""
+        data = self.news_service.get_sources(language=None)
+        if "error" in data or data.get("status") == "error":
+            self.last_error = data.get("message") or data.get("error")
+            return {"error": self.last_error}
+        
+        sources = data.get("sources", [])
+        refreshed_at = time.time()
+        self._build_index(sources, refreshed_at)
+        
+        # Write atomically so a crash never leaves a half-written snapshot
+        self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.snapshot_path.with_suffix(".tmp")
+        temp_path.write_text(json.dumps({"refreshed_at": refreshed_at, "sources": sources}), encoding="utf-8")
+        temp_path.replace(self.snapshot_path)
+        self.last_error = None
+        return {"sources": len(sources), "refreshed_at": datetime.fromtimestamp(refreshed_at).isoformat()}
+    
+    def find(self, category: Optional[str] = None, language: Optional[str] = None,
+             country: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Sources matching every given filter, by set intersection over the field indexes"""
+        self._ensure_loaded()
+        with self._lock:
+            matches: Optional[Set[str]] = None
+            for field, value in (("category", category), ("language", language), ("country", country)):
+                if not value:
+                    continue
+                ids = self._by_field[field].get(value.lower(), set())
+                matches = ids if matches is None else matches & ids
+            
+            ids = self._sources.keys() if matches is None else matches
+            return sorted((self._sources[source_id] for source_id in ids), key=lambda source: source["name"].casefold())
+    
+    def facets(self) -> Dict[str, List[str]]:
+        """Distinct categories, languages and countries, for filter dropdowns"""
+        self._ensure_loaded()
+        with self._lock:
+            return {
+                "categories": sorted(self._by_field["category"]),
+                "languages": sorted(self._by_field["language"]),
+                "countries": sorted(self._by_field["country"])
+            }
+    
+    def unknown_sources(self, source_ids: List[str]) -> List[str]:
+        """Ids not present in the catalog; empty when the catalog has never been loaded"""
+        self._ensure_loaded()
+        with self._lock:
+            if not self._sources:
+                return []
+            return [source_id for source_id in source_ids if source_id not in self._sources]
+    
+    def get_status(self) -> Dict[str, Any]:
+        """Snapshot size, age and refresher health"""
+        self._ensure_loaded()
+        return {
+            "sources": len(self._sources),
+            "refreshed_at": datetime.fromtimestamp(self.refreshed_at).isoformat() if self.refreshed_at else None,
+            "refresh_interval_seconds": self.interval,
+            "running": bool(self._thread and self._thread.is_alive()),
+            "last_error": self.last_error
+        }
+    
+    def _build_index(self, sources: List[Dict[str, Any]], refreshed_at: float) -> None:
+        """Swap in new lookup tables for sources"""
+        by_id: Dict[str, Dict[str, Any]] = {}
+        by_field: Dict[str, Dict[str, Set[str]]] = {"category": {}, "language": {}, "country": {}}
+        for source in sources:
+            if not source.get("id"):
+                continue
+            by_id[source["id"]] = source
+            for field, index in by_field.items():
+                value = (source.get(field) or "").lower()
+                if value:
+                    index.setdefault(value, set()).add(source["id"])
+        
+        with self._lock:
+            self._sources = by_id
+            self._by_field = by_field
+            self.refreshed_at = refreshed_at
+    
+    def _ensure_loaded(self) -> None:
+        """Load the on-disk snapshot once, fetching it on first use if none exists yet"""
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self.snapshot_path.exists():
+            if self.news_service.api_key:
+                self.refresh()
+            return
+        try:
+            snapshot = json.loads(self.snapshot_path.read_text(encoding="utf-8"))
+            self._build_index(snapshot.get("sources", []), snapshot.get("refreshed_at"))
+        except (ValueError, OSError) as e:
+            self.last_error = f"Could not read sources snapshot: {e}"
+    
+    def _run(self) -> None:
+        """Refresh when the snapshot goes stale until stopped"""
+        self._ensure_loaded()
+        while not self._stop_event.is_set():
+            age = time.time() - (self.refreshed_at or 0)
+            if age >= self.interval:
+                try:
+                    self.refresh()
+                except Exception as e:
+                    self.last_error = str(e)
+                wait = self.interval if self.last_error is None else min(self.interval, 300)
+            else:
+                wait = self.interval - age
+            self._stop_event.wait(wait)
+
+# Shared by the app lifecycle hooks and the routes
+news_sources_catalog = NewsSourcesCatalog()
@@ -3,11 +3,22 @@ NewsAPI service
 Handles news data requests
 """
 
+import math
 import requests
 from typing import Dict, Any, Optional, List
 from datetime import datetime, timedelta
 from config.config import config
-from app.utils.helpers import handle_api_error
+from app.utils.helpers import handle_api_error, canonicalize_url, dedupe_articles, run_concurrently
+from app.utils.search_index import ArticleIndex
+from app.utils.trending import TrendingTracker
+
+# Every headline any service instance fetches feeds the same trending counters
+_trending_tracker = TrendingTracker(
+    half_life=config.NEWS_TRENDING_HALF_LIFE,
+    max_items=config.NEWS_TRENDING_MAX_TERMS
+)
+# ...and the local full-text index, so repeat queries can skip the upstream quota
+_article_index = ArticleIndex(config.NEWS_INDEX_DIR)
 
 class NewsAPIService:
     """Service for NewsAPI integration"""
@@ -27,21 +38,25 @@ class NewsAPIService:
             url = f"{self.base_url}/top-headlines"
             params = {
                 "apiKey": self.api_key,
-                "country": country,
                 "pageSize": min(page_size, 100)  # API limit is 100
             }
             
-            if category:
-                params["category"] = category
+            # NewsAPI rejects sources combined with country or category
             if sources:
                 params["sources"] = sources
+            else:
+                params["country"] = country
+                if category:
+                    params["category"] = category
             if q:
                 params["q"] = q
             
             response = requests.get(url, params=params, timeout=10)
             response.raise_for_status()
             
-            return response.json()
+            data = response.json()
+            self._observe(data, [] if sources else [f"{country}/{category or 'general'}"])
+            return data
             
         except requests.exceptions.RequestException as e:
             return handle_api_error(e, "NewsAPI")
@@ -77,26 +92,76 @@ class NewsAPIService:
             response = requests.get(url, params=params, timeout=10)
             response.raise_for_status()
             
-            return response.json()
+            data = response.json()
+            self._observe(data)
+            return data
             
         except requests.exceptions.RequestException as e:
             return handle_api_error(e, "NewsAPI")
         except Exception as e:
             return handle_api_error(e, "NewsAPI")
     
-    def get_sources(self, category: Optional[str] = None, language: str = "en",
+    def crawl_news(self, query: str, language: str = "en", sort_by: str = "publishedAt",
+                   from_date: Optional[str] = None, to_date: Optional[str] = None,
+                   max_pages: Optional[int] = None) -> Dict[str, Any]:
+        """Fetch result pages concurrently until totalResults is covered or max_pages is reached.
+        Articles are merged in page order and deduplicated by canonical URL.
+        """
+        try:
+            max_pages = min(max_pages or config.NEWS_CRAWL_MAX_PAGES, config.NEWS_CRAWL_MAX_PAGES)
+            
+            # The first page tells us how many pages exist
+            first_page = self.search_news(query, language, sort_by, from_date, to_date, page_size=100, page=1)
+            if "error" in first_page:
+                return first_page
+            if first_page.get("status") == "error":
+                return {"error": first_page.get("message", "NewsAPI error")}
+            
+            total_results = first_page.get("totalResults", 0)
+            page_count = max(1, min(math.ceil(total_results / 100), max_pages))
+            
+            def fetch_page(page: int) -> Dict[str, Any]:
+                return self.search_news(query, language, sort_by, from_date, to_date, page_size=100, page=page)
+            
+            pages = [first_page] + run_concurrently(fetch_page, list(range(2, page_count + 1)), config.NEWS_CRAWL_CONCURRENCY)
+            
+            articles = []
+            page_errors = {}
+            for page_number, page in enumerate(pages, start=1):
+                if "error" in page or page.get("status") == "error":
+                    # Plans with a result cap reject deep pages; keep what we have
+                    page_errors[page_number] = page.get("message") or page.get("error")
+                    continue
+                articles.extend(page.get("articles", []))
+            
+            unique_articles = dedupe_articles(articles)
+            
+            return {
+                "status": "ok",
+                "totalResults": total_results,
+                "articles": unique_articles,
+                "pages_fetched": len(pages) - len(page_errors),
+                "page_errors": page_errors,
+                "duplicates_removed": len(articles) - len(unique_articles)
+            }
+            
+        except Exception as e:
+            return handle_api_error(e, "NewsAPI")
+    
+    def get_sources(self, category: Optional[str] = None, language: Optional[str] = "en",
                    country: Optional[str] = None) -> Dict[str, Any]:
-        """Get available news sources"""
+        """Get available news sources (all languages when language is None)"""
         try:
             if not self.api_key:
                 return {"error": "NewsAPI key not configured"}
             
             url = f"{self.base_url}/sources"
             params = {
-                "apiKey": self.api_key,
-                "language": language
+                "apiKey": self.api_key
             }
             
+            if language:
+                params["language"] = language
             if category:
                 params["category"] = category
             if country:
@@ -132,7 +197,9 @@ class NewsAPIService:
             response = requests.get(url, params=params, timeout=10)
             response.raise_for_status()
             
-            return response.json()
+            data = response.json()
+            self._observe(data)
+            return data
             
         except requests.exceptions.RequestException as e:
             return handle_api_error(e, "NewsAPI")
@@ -164,41 +231,129 @@ class NewsAPIService:
             response = requests.get(url, params=params, timeout=10)
             response.raise_for_status()
             
-            return response.json()
+            data = response.json()
+            self._observe(data)
+            return data
             
         except requests.exceptions.RequestException as e:
             return handle_api_error(e, "NewsAPI")
         except Exception as e:
             return handle_api_error(e, "NewsAPI")
     
-    def get_trending_topics(self, country: str = "us", category: str = "general") -> Dict[str, Any]:
-        """Get trending topics (simulated by getting top headlines)"""
+    def fan_out_news(self, keywords: Optional[List[str]] = None, domains: Optional[List[str]] = None,
+                     language: str = "en", page_size: int = 20) -> Dict[str, Any]:
+        """Run one query per keyword and per domain concurrently and merge the results.
+        Articles are interleaved across queries so each topic is equally represented,
+        deduplicated by canonical URL, and attributed to every query that returned them.
+        """
         try:
             if not self.api_key:
                 return {"error": "NewsAPI key not configured"}
             
-            # Get top headlines to identify trending topics
-            headlines = self.get_top_headlines(country=country, category=category, page_size=50)
+            queries = [("keyword", keyword.strip()) for keyword in keywords or [] if keyword.strip()]
+            queries += [("domain", domain.strip().lower()) for domain in domains or [] if domain.strip()]
+            queries = list(dict.fromkeys(queries))
+            if not queries:
+                return {"error": "At least one keyword or domain must be specified"}
+            if len(queries) > config.NEWS_FANOUT_MAX_QUERIES:
+                return {"error": f"At most {config.NEWS_FANOUT_MAX_QUERIES} keywords and domains per request"}
+            
+            def fetch(query: tuple) -> Dict[str, Any]:
+                kind, value = query
+                if kind == "keyword":
+                    return self.search_news(f'"{value}"' if " " in value else value, language,
+                                            sort_by="relevancy", page_size=page_size)
+                return self.get_news_by_domain([value], page_size)
+            
+            responses = run_concurrently(fetch, queries, config.NEWS_CRAWL_CONCURRENCY)
+            
+            results, query_errors, query_counts = [], {}, {}
+            for (kind, value), response in zip(queries, responses):
+                label = f"{kind}:{value}"
+                if "error" in response or response.get("status") == "error":
+                    query_errors[label] = response.get("message") or response.get("error")
+                    results.append([])
+                    continue
+                articles = response.get("articles", [])
+                query_counts[label] = len(articles)
+                results.append(articles)
+            
+            merged: Dict[str, Dict[str, Any]] = {}
+            total_seen = 0
+            for rank in range(max((len(articles) for articles in results), default=0)):
+                for (kind, value), articles in zip(queries, results):
+                    if rank >= len(articles):
+                        continue
+                    article = articles[rank]
+                    total_seen += 1
+                    key = canonicalize_url(article.get("url", "")) or str(id(article))
+                    entry = merged.setdefault(key, {**article, "matchedKeywords": [], "matchedDomains": []})
+                    entry["matchedKeywords" if kind == "keyword" else "matchedDomains"].append(value)
             
-            if "error" in headlines:
-                return headlines
+            return {
+                "status": "ok",
+                "totalResults": len(merged),
+                "articles": list(merged.values()),
+                "query_counts": query_counts,
+                "query_errors": query_errors,
+                "duplicates_removed": total_seen - len(merged)
+            }
             
-            # Extract keywords from headlines (simple implementation)
-            articles = headlines.get("articles", [])
-            trending_keywords = []
+        except Exception as e:
+            return handle_api_error(e, "NewsAPI")
+    
+    def get_trending_topics(self, country: str = "us", category: str = "general",
+                            limit: int = 20, refresh: bool = False) -> Dict[str, Any]:
+        """Get trending terms and bigrams from the decayed counters.
+        Headlines are only fetched when the scope has never been observed or refresh is set.
+        """
+        try:
+            scope = f"{country}/{category or 'general'}"
+            if refresh or not _trending_tracker.has_scope(scope):
+                headlines = self.get_top_headlines(country=country, category=category, page_size=100)
+                if "error" in headlines:
+                    return headlines
             
-            for article in articles[:10]:  # Analyze top 10 articles
-                title = article.get("title", "").lower()
-                # Simple keyword extraction (in production, use NLP)
-                words = title.split()
-                trending_keywords.extend([word for word in words if len(word) > 4])
+            trending = _trending_tracker.trending(scope, max(1, min(limit, 100)))
+            overall = _trending_tracker.trending("all", max(1, min(limit, 100)))
             
             return {
-                "trending_keywords": list(set(trending_keywords))[:20],
-                "articles_count": len(articles),
+                "trending_keywords": [entry["term"] for entry in trending["terms"]],
+                "terms": trending["terms"],
+                "bigrams": trending["bigrams"],
+                "overall_terms": overall["terms"],
+                "articles_count": trending["articles_observed"],
+                "updated_at": trending["updated_at"],
                 "country": country,
                 "category": category
             }
             
         except Exception as e:
             return handle_api_error(e, "NewsAPI")
+    
+    def search_local(self, query: str, from_date: Optional[str] = None, to_date: Optional[str] = None,
+                     page_size: int = 20) -> Dict[str, Any]:
+        """Search previously fetched articles with BM25, without calling NewsAPI"""
+        try:
+            if not query.strip():
+                return {"error": "Query cannot be empty"}
+            
+            for value in (from_date, to_date):
+                if value:
+                    try:
+                        datetime.fromisoformat(value)
+                    except ValueError:
+                        return {"error": f"Invalid date {value!r}; use YYYY-MM-DD"}
+            
+            results = _article_index.search(query, from_date, to_date, max(1, min(page_size, 100)))
+            results["status"] = "ok"
+            return results
+            
+        except Exception as e:
+            return handle_api_error(e, "Local news index")
+    
+    def _observe(self, data: Dict[str, Any], scopes: Optional[List[str]] = None) -> None:
+        """Feed a successful NewsAPI response into the trending counters and local index"""
+        if data.get("status") == "ok" and data.get("articles"):
+            _trending_tracker.observe(data["articles"], scopes or [])
+            _article_index.add_articles(data["articles"])
@@ -4,9 +4,22 @@ Handles weather data requests
 """
 
 import requests
-from typing import Dict, Any, Optional
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional, List, Tuple
 from config.config import config
-from app.utils.helpers import handle_api_error, validate_coordinates
+from app.utils.helpers import (
+    handle_api_error, validate_coordinates, format_weather_data,
+    flatten_weather_data, run_concurrently
+)
+from app.utils.spatial_cache import SpatialCache
+from app.utils.gazetteer import gazetteer
+
+# Observations are shared across service instances so nearby map requests reuse them
+_spatial_weather_cache = SpatialCache(
+    grid_degrees=config.WEATHER_CACHE_GRID_DEGREES,
+    radius_km=config.WEATHER_CACHE_RADIUS_KM,
+    ttl=config.WEATHER_CACHE_TTL
+)
 
 class OpenWeatherService:
     """Service for OpenWeatherMap API integration"""
@@ -15,12 +28,18 @@ class OpenWeatherService:
         self.api_key = config.OPENWEATHER_API_KEY
         self.base_url = config.OPENWEATHER_BASE_URL
         
-    def get_current_weather(self, city: str, country_code: Optional[str] = None) -> Dict[str, Any]:
+    def get_current_weather(self, city: str, country_code: Optional[str] = None,
+                            use_cache: bool = True) -> Dict[str, Any]:
         """Get current weather for a city"""
         try:
             if not self.api_key:
                 return {"error": "OpenWeather API key not configured"}
             
+            # Known cities are fetched by canonical coordinates so every spelling shares a cache entry
+            known_city = gazetteer.resolve(city, country_code)
+            if known_city:
+                return self.get_weather_by_coordinates(known_city["lat"], known_city["lon"], use_cache)
+            
             query = f"{city},{country_code}" if country_code else city
             url = f"{self.base_url}/weather"
             params = {
@@ -39,8 +58,10 @@ class OpenWeatherService:
         except Exception as e:
             return handle_api_error(e, "OpenWeatherMap")
     
-    def get_weather_by_coordinates(self, lat: float, lon: float) -> Dict[str, Any]:
-        """Get weather by coordinates"""
+    def get_weather_by_coordinates(self, lat: float, lon: float, use_cache: bool = True) -> Dict[str, Any]:
+        """Get weather by coordinates.
+        use_cache=False always asks upstream (the fresh observation is still cached).
+        """
         try:
             if not self.api_key:
                 return {"error": "OpenWeather API key not configured"}
@@ -48,6 +69,11 @@ class OpenWeatherService:
             if not validate_coordinates(lat, lon):
                 return {"error": "Invalid coordinates"}
             
+            # Answer from the nearest fresh observation within the tolerance radius
+            cached = _spatial_weather_cache.get(lat, lon) if use_cache else None
+            if cached is not None:
+                return cached["value"]
+            
             url = f"{self.base_url}/weather"
             params = {
                 "lat": lat,
@@ -59,7 +85,9 @@ class OpenWeatherService:
             response = requests.get(url, params=params, timeout=10)
             response.raise_for_status()
             
-            return response.json()
+            data = response.json()
+            _spatial_weather_cache.set(lat, lon, data)
+            return data
             
         except requests.exceptions.RequestException as e:
             return handle_api_error(e, "OpenWeatherMap")
@@ -83,6 +111,11 @@ class OpenWeatherService:
                 "cnt": days * 8  # 8 forecasts per day
             }
             
+            known_city = gazetteer.resolve(city)
+            if known_city:
+                del params["q"]
+                params["lat"], params["lon"] = known_city["lat"], known_city["lon"]
+            
             response = requests.get(url, params=params, timeout=10)
             response.raise_for_status()
             
@@ -103,11 +136,13 @@ class OpenWeatherService:
                 return {"error": "Invalid coordinates"}
             
             # Note: This requires One Call API subscription
-            url = f"{self.base_url}/onecall/timemachine"
+            # The timemachine endpoint takes a Unix timestamp; sample each day at 12:00 UTC
+            day = datetime.strptime(date, "%Y-%m-%d").replace(hour=12, tzinfo=timezone.utc)
+            url = f"{config.OPENWEATHER_ONECALL_URL}/timemachine"
             params = {
                 "lat": lat,
                 "lon": lon,
-                "dt": int(date.replace("-", "")),
+                "dt": int(day.timestamp()),
                 "appid": self.api_key,
                 "units": "metric"
             }
@@ -121,3 +156,96 @@ class OpenWeatherService:
             return handle_api_error(e, "OpenWeatherMap")
         except Exception as e:
             return handle_api_error(e, "OpenWeatherMap")
+    
+    def normalize_location(self, location: str, is_coordinates: bool = False) -> Tuple:
+        """Normalize a city query or 'lat,lon' string into a hashable lookup key.
+        Raises ValueError for malformed input.
+        """
+        if is_coordinates:
+            parts = location.split(",")
+            if len(parts) != 2:
+                raise ValueError(f"Coordinates must be 'lat,lon': {location!r}")
+            lat, lon = round(float(parts[0]), 4), round(float(parts[1]), 4)
+            if not validate_coordinates(lat, lon):
+                raise ValueError(f"Invalid coordinates: {location!r}")
+            return ("coordinates", lat, lon)
+        
+        name, _, country_code = location.partition(",")
+        name = " ".join(name.split())
+        if not name:
+            raise ValueError("City name cannot be empty")
+        
+        known_city = gazetteer.resolve(name, country_code)
+        if known_city:
+            return ("coordinates", known_city["lat"], known_city["lon"])
+        return ("city", name.casefold(), country_code.strip().upper() or None)
+    
+    def get_weather_batch(self, cities: Optional[List[str]] = None,
+                          coordinates: Optional[List[str]] = None,
+                          use_cache: bool = True) -> Dict[str, Any]:
+        """Get current weather for many cities and/or 'lat,lon' points.
+        Duplicates are fetched once; per-location failures are reported as rows.
+        """
+        try:
+            if not self.api_key:
+                return {"error": "OpenWeather API key not configured"}
+            
+            requested = [(city, False) for city in cities or []]
+            requested += [(point, True) for point in coordinates or []]
+            if not requested:
+                return {"error": "At least one city or coordinate pair must be specified"}
+            if len(requested) > config.WEATHER_BATCH_MAX_LOCATIONS:
+                return {"error": f"At most {config.WEATHER_BATCH_MAX_LOCATIONS} locations per batch"}
+            
+            # Keep the first query seen for each normalized key, in request order
+            entries = []
+            unique_keys = {}
+            for query, is_coordinates in requested:
+                try:
+                    key = self.normalize_location(query, is_coordinates)
+                except ValueError as e:
+                    entries.append({"query": query, "error": str(e)})
+                    continue
+                if key not in unique_keys:
+                    unique_keys[key] = query
+                    entries.append(key)
+            
+            keys = list(unique_keys)
+            results = dict(zip(keys, run_concurrently(lambda key: self._fetch_location(key, use_cache), keys,
+                                                      config.WEATHER_BATCH_CONCURRENCY)))
+            
+            rows = []
+            for entry in entries:
+                if isinstance(entry, dict):
+                    rows.append(entry)
+                    continue
+                
+                row = {"query": unique_keys[entry]}
+                data = results[entry]
+                formatted = data if "error" in data else format_weather_data(data)
+                if "error" in formatted:
+                    row["error"] = formatted.get("message") or formatted["error"]
+                else:
+                    row.update(flatten_weather_data(formatted))
+                    row["error"] = None
+                rows.append(row)
+            
+            # Give every row the same columns so the batch exports as one flat table
+            columns = ["query"] + list(flatten_weather_data({})) + ["error"]
+            rows = [{column: row.get(column) for column in columns} for row in rows]
+            
+            return {
+                "requested": len(requested),
+                "unique_locations": len(keys),
+                "failed": sum(1 for row in rows if row["error"]),
+                "rows": rows
+            }
+            
+        except Exception as e:
+            return handle_api_error(e, "OpenWeatherMap")
+    
+    def _fetch_location(self, key: Tuple, use_cache: bool = True) -> Dict[str, Any]:
+        """Fetch current weather for a normalized location key"""
+        if key[0] == "coordinates":
+            return self.get_weather_by_coordinates(key[1], key[2], use_cache)
+        return self.get_current_weather(key[1], key[2], use_cache)
@@ -3,10 +3,24 @@ Pexels API service
 Handles image data requests
 """
 
+import math
 import requests
 from typing import Dict, Any, Optional, List
 from config.config import config
-from app.utils.helpers import handle_api_error
+from app.utils.helpers import handle_api_error, run_concurrently
+
+CATEGORY_TERMS = {
+    "nature": ["nature", "landscape", "forest", "mountain"],
+    "business": ["business", "office", "corporate"],
+    "technology": ["technology", "computer", "digital"],
+    "people": ["people", "portrait", "human"],
+    "food": ["food", "restaurant", "cuisine"],
+    "travel": ["travel", "vacation", "destination"],
+    "sports": ["sports", "fitness", "exercise"],
+    "animals": ["animals", "wildlife", "pets"],
+    "architecture": ["architecture", "building", "city"],
+    "abstract": ["abstract", "art", "design"]
+}
 
 class PexelsService:
     """Service for Pexels API integration"""
@@ -145,25 +159,76 @@ class PexelsService:
         return self.get_curated_photos(per_page, page)
     
     def search_photos_by_category(self, category: str, per_page: int = 15, page: int = 1) -> Dict[str, Any]:
-        """Search photos by category"""
-        category_queries = {
-            "nature": "nature landscape forest mountain",
-            "business": "business office corporate",
-            "technology": "technology computer digital",
-            "people": "people portrait human",
-            "food": "food restaurant cuisine",
-            "travel": "travel vacation destination",
-            "sports": "sports fitness exercise",
-            "animals": "animals wildlife pets",
-            "architecture": "architecture building city",
-            "abstract": "abstract art design"
-        }
-        
-        if category.lower() not in category_queries:
-            return {"error": f"Category '{category}' not supported"}
-        
-        query = category_queries[category.lower()]
-        return self.search_photos(query, per_page, page)
+        """Search photos by category.
+        Each category term is searched separately and concurrently; results are
+        interleaved by rank, deduplicated by photo id and paged deeper per term
+        until the requested page of the merged results is filled.
+        """
+        try:
+            terms = CATEGORY_TERMS.get(category.lower())
+            if not terms:
+                return {"error": f"Category '{category}' not supported"}
+            
+            needed = per_page * page
+            # Headroom for photos that several terms return
+            term_page_size = min(80, math.ceil(needed * 1.5 / len(terms)))
+            results: Dict[str, List[Dict[str, Any]]] = {term: [] for term in terms}
+            totals: Dict[str, int] = {}
+            term_errors: Dict[str, str] = {}
+            active = list(terms)
+            merged, total_seen = [], 0
+            
+            for term_page in range(1, config.PEXELS_CATEGORY_MAX_PAGES + 1):
+                responses = run_concurrently(lambda term: self.search_photos(term, term_page_size, term_page),
+                                             active, len(active))
+                for term, response in zip(list(active), responses):
+                    if "error" in response:
+                        term_errors[term] = response.get("message") or response["error"]
+                        active.remove(term)
+                        continue
+                    photos = response.get("photos", [])
+                    totals[term] = response.get("total_results", 0)
+                    results[term].extend(photos)
+                    if len(photos) < term_page_size or len(results[term]) >= totals[term]:
+                        active.remove(term)
+                
+                merged, total_seen = self._merge_by_rank(results)
+                if len(merged) >= needed or not active:
+                    break
+            
+            # Terms failing on a deeper page still leave their earlier photos
+            if not merged and len(term_errors) == len(terms):
+                return {"error": next(iter(term_errors.values()))}
+            
+            return {
+                "category": category.lower(),
+                "page": page,
+                "per_page": per_page,
+                "total_results": len(merged) if not active else max(len(merged), sum(totals.values())),
+                "photos": merged[(page - 1) * per_page:needed],
+                "term_counts": {term: len(photos) for term, photos in results.items()},
+                "term_errors": term_errors,
+                "duplicates_removed": total_seen - len(merged)
+            }
+            
+        except Exception as e:
+            return handle_api_error(e, "Pexels")
+    
+    def _merge_by_rank(self, results: Dict[str, List[Dict[str, Any]]]) -> tuple:
+        """Interleave per-term results by rank and deduplicate by photo id.
+        Returns (photos with matched_terms, number of results seen).
+        """
+        merged: Dict[Any, Dict[str, Any]] = {}
+        total_seen = 0
+        for rank in range(max((len(photos) for photos in results.values()), default=0)):
+            for term, photos in results.items():
+                if rank >= len(photos):
+                    continue
+                total_seen += 1
+                photo = photos[rank]
+                entry = merged.setdefault(photo.get("id"), {**photo, "matched_terms": []})
+                entry["matched_terms"].append(term)
+        return list(merged.values()), total_seen
     
     def get_photographer_photos(self, photographer_id: int, per_page: int = 15, page: int = 1) -> Dict[str, Any]:
         """Get photos by a specific photographer"""
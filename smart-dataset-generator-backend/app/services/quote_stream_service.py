@@ -0,0 +1,112 @@
+"""
+Live stock quote streaming service
+Shares one upstream poller per symbol across every subscriber
+"""
+
+import asyncio
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Set
+from config.config import config
+from app.services.alphavantage_service import AlphaVantageService
+
+class QuoteStreamer:
+    """Schedules one GLOBAL_QUOTE poller per subscribed symbol and fans updates out"""
+    
+    def __init__(self, stock_service: AlphaVantageService):
+        self.stock_service = stock_service
+        self.calls_per_minute = config.ALPHAVANTAGE_CALLS_PER_MINUTE
+        self.min_interval = config.QUOTE_STREAM_MIN_INTERVAL
+        self.max_interval = config.QUOTE_STREAM_MAX_INTERVAL
+        self.heartbeat_interval = config.QUOTE_STREAM_HEARTBEAT
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._pollers: Dict[str, asyncio.Task] = {}
+        self._latest: Dict[str, Dict[str, Any]] = {}
+    
+    def poll_interval(self) -> float:
+        """Seconds between polls so that all active pollers stay within the rate budget"""
+        active_pollers = max(1, len(self._pollers))
+        interval = 60.0 * active_pollers / max(1, self.calls_per_minute)
+        return min(max(interval, self.min_interval), self.max_interval)
+    
+    def subscribe(self, symbol: str) -> asyncio.Queue:
+        """Register a subscriber queue, starting the symbol's poller if needed"""
+        symbol = symbol.upper()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=10)
+        self._subscribers.setdefault(symbol, set()).add(queue)
+        
+        if symbol in self._latest:
+            queue.put_nowait(self._latest[symbol])
+        if symbol not in self._pollers:
+            self._pollers[symbol] = asyncio.create_task(self._poll(symbol))
+        
+        return queue
+    
+    def unsubscribe(self, symbol: str, queue: asyncio.Queue) -> None:
+        """Remove a subscriber and stop the poller once nobody is listening"""
+        symbol = symbol.upper()
+        subscribers = self._subscribers.get(symbol)
+        if subscribers is None:
+            return
+        
+        subscribers.discard(queue)
+        if not subscribers:
+            del self._subscribers[symbol]
+            self._latest.pop(symbol, None)
+            poller = self._pollers.pop(symbol, None)
+            if poller:
+                poller.cancel()
+    
+    def get_status(self) -> Dict[str, Any]:
+        """Get active pollers, subscriber counts and the current cadence"""
+        return {
+            "symbols": {symbol: len(queues) for symbol, queues in self._subscribers.items()},
+            "active_pollers": len(self._pollers),
+            "poll_interval": self.poll_interval()
+        }
+    
+    async def _poll(self, symbol: str) -> None:
+        """Fetch the quote for symbol and publish it until cancelled"""
+        while True:
+            data = await asyncio.to_thread(self.stock_service.get_stock_quote, symbol)
+            
+            if "error" in data:
+                event = {"event": "error", "symbol": symbol, "data": data}
+            elif not data.get("Global Quote"):
+                # Alpha Vantage reports throttling and bad symbols with HTTP 200
+                message = data.get("Note") or data.get("Information") or data.get("Error Message")
+                event = {"event": "error", "symbol": symbol, "data": {"error": message or "No quote available"}}
+            else:
+                event = {"event": "quote", "symbol": symbol, "data": data["Global Quote"]}
+                self._latest[symbol] = event
+            
+            event["timestamp"] = datetime.now().isoformat()
+            self._publish(symbol, event)
+            
+            await asyncio.sleep(self.poll_interval())
+    
+    def _publish(self, symbol: str, event: Dict[str, Any]) -> None:
+        """Push an event to every subscriber, dropping the oldest one for slow readers"""
+        for queue in self._subscribers.get(symbol, set()):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(event)
+    
+    async def stream(self, symbol: str) -> AsyncIterator[str]:
+        """Yield Server-Sent Events for symbol until the client disconnects"""
+        queue = self.subscribe(symbol)
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=self.heartbeat_interval)
+                except asyncio.TimeoutError:
+                    # Comment lines keep proxies from closing idle connections
+                    yield ": keep-alive\n\n"
+                    continue
+                
+                yield f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            self.unsubscribe(symbol, queue)
+
+# Shared by every route so subscribers to one symbol share one poller
+quote_streamer = QuoteStreamer(AlphaVantageService())
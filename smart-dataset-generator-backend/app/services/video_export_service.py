@@ -0,0 +1,173 @@
+"""
+Video export service
+Picks a rendition per Pexels video, downloads files in parallel with HTTP
+Range resume under a shared bandwidth budget, and streams them into a ZIP
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+import requests
+from config.config import config
+from app.utils.helpers import iter_csv
+from app.utils.rate_limiter import RateLimiter
+
+VIDEO_QUALITIES = ("uhd", "hd", "sd")
+CHUNK_SIZE = 1 << 16
+
+# One budget shared by every export so parallel jobs cannot saturate the link
+_video_bandwidth = (
+    RateLimiter(config.VIDEO_BANDWIDTH_BYTES_PER_SEC, per=1.0,
+                capacity=max(config.VIDEO_BANDWIDTH_BYTES_PER_SEC, CHUNK_SIZE))
+    if config.VIDEO_BANDWIDTH_BYTES_PER_SEC > 0 else None
+)
+
+def select_rendition(video: Dict[str, Any], quality: Optional[str] = None,
+                     max_width: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """Pick the widest MP4 rendition matching quality and max_width.
+    Falls back to the narrowest rendition when nothing fits under max_width.
+    """
+    files = [item for item in video.get("video_files", []) if item.get("link") and item.get("file_type", "video/mp4") == "video/mp4"]
+    if quality:
+        files = [item for item in files if item.get("quality") == quality] or files
+    if not files:
+        return None
+    
+    fitting = [item for item in files if not max_width or (item.get("width") or 0) <= max_width]
+    if fitting:
+        return max(fitting, key=lambda item: ((item.get("width") or 0), item.get("fps") or 0))
+    return min(files, key=lambda item: item.get("width") or 0)
+
+class _ZipStream:
+    """Write-only file object that hands zipfile output to a generator in pieces"""
+    
+    def __init__(self):
+        self._chunks: List[bytes] = []
+    
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+    
+    def flush(self) -> None:
+        pass
+    
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+class VideoExporter:
+    """Downloads selected video renditions and streams them as a ZIP archive"""
+    
+    def __init__(self):
+        self.concurrency = config.VIDEO_DOWNLOAD_CONCURRENCY
+        self.max_retries = config.VIDEO_DOWNLOAD_RETRIES
+    
+    def plan(self, videos: List[Dict[str, Any]], quality: Optional[str] = None,
+             max_width: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Choose one rendition per video; videos without a usable file are skipped"""
+        planned = []
+        for video in videos:
+            rendition = select_rendition(video, quality, max_width)
+            if not rendition:
+                continue
+            planned.append({
+                "id": video.get("id"),
+                "file": f"videos/{video.get('id')}_{rendition.get('width')}x{rendition.get('height')}.mp4",
+                "url": rendition["link"],
+                "quality": rendition.get("quality"),
+                "width": rendition.get("width"),
+                "height": rendition.get("height"),
+                "fps": rendition.get("fps"),
+                "duration": video.get("duration"),
+                "user": (video.get("user") or {}).get("name", ""),
+                "page_url": video.get("url", "")
+            })
+        return planned
+    
+    def stream_zip(self, planned: List[Dict[str, Any]]) -> Iterator[bytes]:
+        """Download planned files in parallel and yield a ZIP as each finishes.
+        Only partial downloads touch the disk; every file is deleted once archived.
+        """
+        work_dir = Path(tempfile.mkdtemp(prefix="videos_", dir=config.TEMP_DIR if os.path.isdir(config.TEMP_DIR) else None))
+        stream = _ZipStream()
+        manifest = []
+        stop = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=max(1, min(self.concurrency, len(planned))))
+        try:
+            futures = {
+                executor.submit(self.download, item["url"], work_dir / f"{index}.part", stop): item
+                for index, item in enumerate(planned)
+            }
+            with zipfile.ZipFile(stream, "w", compression=zipfile.ZIP_STORED, allowZip64=True) as archive:
+                for future in as_completed(futures):
+                    item = futures[future]
+                    path, error = future.result()
+                    row = {**item, "bytes": 0, "status": "ok" if path else f"error: {error}"}
+                    if path:
+                        row["bytes"] = path.stat().st_size
+                        with open(path, "rb") as source, archive.open(item["file"], "w", force_zip64=True) as entry:
+                            while True:
+                                chunk = source.read(CHUNK_SIZE * 4)
+                                if not chunk:
+                                    break
+                                entry.write(chunk)
+                                yield stream.drain()
+                        path.unlink()
+                    manifest.append(row)
+                    yield stream.drain()
+                
+                archive.writestr("manifest.csv", "".join(iter_csv(manifest)))
+            yield stream.drain()
+        finally:
+            # The client may disconnect mid-stream; stop downloads before removing their files
+            stop.set()
+            executor.shutdown(wait=True, cancel_futures=True)
+            shutil.rmtree(work_dir, ignore_errors=True)
+    
+    def download(self, url: str, path: Path, stop: Optional[threading.Event] = None) -> tuple:
+        """Download url to path, resuming with HTTP Range after failures.
+        Returns (path, None) on success or (None, error message).
+        """
+        error = None
+        for attempt in range(self.max_retries + 1):
+            if stop is not None and stop.is_set():
+                return None, "cancelled"
+            offset = path.stat().st_size if path.exists() else 0
+            headers = {"Range": f"bytes={offset}-"} if offset else {}
+            try:
+                with requests.get(url, headers=headers, stream=True, timeout=30) as response:
+                    if response.status_code == 416:
+                        # Range starts at the end: the previous attempt already finished
+                        return path, None
+                    response.raise_for_status()
+                    
+                    # A server that ignores Range sends the whole file again
+                    mode = "ab" if offset and response.status_code == 206 else "wb"
+                    expected = response.headers.get("Content-Length")
+                    written = 0
+                    with open(path, mode) as handle:
+                        for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                            if stop is not None and stop.is_set():
+                                return None, "cancelled"
+                            if _video_bandwidth:
+                                _video_bandwidth.acquire(len(chunk))
+                            handle.write(chunk)
+                            written += len(chunk)
+                    
+                    if expected is not None and written < int(expected):
+                        raise IOError(f"Connection closed after {written} of {expected} bytes")
+                    return path, None
+            
+            except Exception as e:
+                error = str(e)
+                if attempt < self.max_retries:
+                    time.sleep(min(2 ** attempt, 10))
+        
+        return None, error
@@ -0,0 +1,218 @@
+"""
+Historical weather backfill service
+Fans One Call timemachine requests out over locations and dates,
+checkpointing every completed day as a Parquet partition
+"""
+
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import pandas as pd
+from config.config import config
+from app.services.openweather_service import OpenWeatherService
+from app.utils.gazetteer import gazetteer
+from app.utils.helpers import handle_api_error, validate_coordinates, validate_date_range
+from app.utils.rate_limiter import RateLimiter
+
+class WeatherBackfillService:
+    """Runs resumable historical weather backfill jobs in background threads"""
+    
+    def __init__(self, weather_service: Optional[OpenWeatherService] = None):
+        self.weather_service = weather_service or OpenWeatherService()
+        self.base_dir = Path(config.WEATHER_BACKFILL_DIR)
+        self.rate_limiter = RateLimiter(config.OPENWEATHER_CALLS_PER_MINUTE)
+        self._running: Dict[str, threading.Thread] = {}
+        self._errors: Dict[str, Dict[str, str]] = {}
+        self._lock = threading.Lock()
+    
+    def resolve_locations(self, locations: List[str]) -> List[Dict[str, Any]]:
+        """Resolve city names or 'lat,lon' strings to keyed coordinates.
+        Raises ValueError for locations that cannot be resolved.
+        """
+        resolved = {}
+        for location in locations:
+            parts = location.split(",")
+            try:
+                lat, lon = float(parts[0]), float(parts[1])
+                is_coordinates = len(parts) == 2
+            except (ValueError, IndexError):
+                is_coordinates = False
+            
+            if is_coordinates:
+                if not validate_coordinates(lat, lon):
+                    raise ValueError(f"Invalid coordinates: {location!r}")
+                key = f"{lat:.4f}_{lon:.4f}"
+                resolved[key] = {"key": key, "name": key, "lat": lat, "lon": lon}
+                continue
+            
+            city = gazetteer.resolve(location)
+            if not city:
+                raise ValueError(f"Unknown city {location!r}; pass coordinates as 'lat,lon'")
+            resolved[city["id"]] = {"key": city["id"], "name": city["name"], "lat": city["lat"], "lon": city["lon"]}
+        
+        return list(resolved.values())
+    
+    def start_job(self, locations: List[str], start_date: str, end_date: str) -> Dict[str, Any]:
+        """Start (or resume) a backfill job. Identical requests map to the same job id."""
+        try:
+            if not self.weather_service.api_key:
+                return {"error": "OpenWeather API key not configured"}
+            if not locations:
+                return {"error": "At least one location must be specified"}
+            if not validate_date_range(start_date, end_date):
+                return {"error": "Dates must be YYYY-MM-DD with start_date <= end_date"}
+            
+            try:
+                resolved = self.resolve_locations(locations)
+            except ValueError as e:
+                return {"error": str(e)}
+            
+            start = datetime.strptime(start_date, "%Y-%m-%d").date()
+            end = datetime.strptime(end_date, "%Y-%m-%d").date()
+            total_tasks = len(resolved) * ((end - start).days + 1)
+            if total_tasks > config.WEATHER_BACKFILL_MAX_TASKS:
+                return {"error": f"Backfill too large: {total_tasks} location-days (max {config.WEATHER_BACKFILL_MAX_TASKS})"}
+            
+            spec = {
+                "locations": sorted(resolved, key=lambda location: location["key"]),
+                "start_date": start_date,
+                "end_date": end_date
+            }
+            job_id = hashlib.sha1(json.dumps(spec, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+            job_dir = self.base_dir / job_id
+            job_dir.mkdir(parents=True, exist_ok=True)
+            
+            spec_path = job_dir / "job.json"
+            if not spec_path.exists():
+                spec["job_id"] = job_id
+                spec["created_at"] = datetime.now().isoformat()
+                spec_path.write_text(json.dumps(spec, indent=2), encoding="utf-8")
+            
+            with self._lock:
+                thread = self._running.get(job_id)
+                if thread is None or not thread.is_alive():
+                    self._errors[job_id] = {}
+                    thread = threading.Thread(target=self._run, args=(job_id,), daemon=True)
+                    self._running[job_id] = thread
+                    thread.start()
+            
+            return self.get_status(job_id)
+        
+        except Exception as e:
+            return handle_api_error(e, "Weather Backfill")
+    
+    def get_status(self, job_id: str) -> Dict[str, Any]:
+        """Get progress for a job from its checkpoints on disk"""
+        spec = self._load_spec(job_id)
+        if spec is None:
+            return {"error": f"Backfill job '{job_id}' not found"}
+        
+        pending = self._pending_tasks(job_id, spec)
+        total = len(spec["locations"]) * len(self._dates(spec))
+        thread = self._running.get(job_id)
+        errors = self._errors.get(job_id, {})
+        
+        return {
+            "job_id": job_id,
+            "running": bool(thread and thread.is_alive()),
+            "total": total,
+            "completed": total - len(pending),
+            "failed": len(errors),
+            "errors": dict(list(errors.items())[:20]),
+            "start_date": spec["start_date"],
+            "end_date": spec["end_date"],
+            "locations": [location["key"] for location in spec["locations"]]
+        }
+    
+    def load_results(self, job_id: str) -> pd.DataFrame:
+        """Read every completed partition of a job into one DataFrame"""
+        job_dir = self.base_dir / job_id
+        parts = sorted(job_dir.glob("date=*/location=*.parquet"))
+        if not parts:
+            return pd.DataFrame()
+        return pd.concat((pd.read_parquet(part) for part in parts), ignore_index=True)
+    
+    def _run(self, job_id: str) -> None:
+        """Fetch every pending location-day concurrently within the rate limit"""
+        spec = self._load_spec(job_id)
+        tasks = self._pending_tasks(job_id, spec)
+        with ThreadPoolExecutor(max_workers=config.WEATHER_BACKFILL_CONCURRENCY) as executor:
+            for location, day in tasks:
+                executor.submit(self._backfill_day, job_id, location, day)
+    
+    def _backfill_day(self, job_id: str, location: Dict[str, Any], day: str) -> None:
+        """Fetch one location-day and checkpoint it as a Parquet partition"""
+        task_key = f"{location['key']}/{day}"
+        try:
+            self.rate_limiter.acquire()
+            data = self.weather_service.get_historical_weather(location["lat"], location["lon"], day)
+            if "error" in data:
+                self._errors[job_id][task_key] = data.get("message") or data["error"]
+                return
+            
+            rows = []
+            for observation in data.get("data", []):
+                weather = (observation.get("weather") or [{}])[0]
+                rows.append({
+                    "location": location["key"],
+                    "location_name": location["name"],
+                    "lat": location["lat"],
+                    "lon": location["lon"],
+                    "date": day,
+                    "time": datetime.fromtimestamp(observation.get("dt", 0), tz=timezone.utc).replace(tzinfo=None),
+                    "temperature": observation.get("temp"),
+                    "feels_like": observation.get("feels_like"),
+                    "pressure": observation.get("pressure"),
+                    "humidity": observation.get("humidity"),
+                    "dew_point": observation.get("dew_point"),
+                    "clouds": observation.get("clouds"),
+                    "wind_speed": observation.get("wind_speed"),
+                    "wind_direction": observation.get("wind_deg"),
+                    "weather_main": weather.get("main"),
+                    "weather_description": weather.get("description")
+                })
+            
+            # Write to a temp file first so a crash never leaves a half-written checkpoint
+            partition = self._partition_path(job_id, location["key"], day)
+            partition.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = partition.with_suffix(".tmp")
+            pd.DataFrame(rows).to_parquet(temp_path, index=False)
+            os.replace(temp_path, partition)
+            self._errors[job_id].pop(task_key, None)
+        
+        except Exception as e:
+            self._errors[job_id][task_key] = str(e)
+    
+    def _load_spec(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Load a job's spec, or None if the job does not exist"""
+        spec_path = self.base_dir / job_id / "job.json"
+        if not spec_path.exists():
+            return None
+        return json.loads(spec_path.read_text(encoding="utf-8"))
+    
+    def _dates(self, spec: Dict[str, Any]) -> List[str]:
+        """Every date in the job's range as YYYY-MM-DD"""
+        start = datetime.strptime(spec["start_date"], "%Y-%m-%d").date()
+        end = datetime.strptime(spec["end_date"], "%Y-%m-%d").date()
+        return [(start + timedelta(days=offset)).isoformat() for offset in range((end - start).days + 1)]
+    
+    def _pending_tasks(self, job_id: str, spec: Dict[str, Any]) -> List[tuple]:
+        """Location-days that have no checkpoint yet"""
+        return [
+            (location, day)
+            for day in self._dates(spec)
+            for location in spec["locations"]
+            if not self._partition_path(job_id, location["key"], day).exists()
+        ]
+    
+    def _partition_path(self, job_id: str, location_key: str, day: str) -> Path:
+        """Hive-style partition file for one location-day"""
+        return self.base_dir / job_id / f"date={day}" / f"location={location_key}.parquet"
+
+# Shared so job state survives across requests
+weather_backfill_service = WeatherBackfillService()
@@ -0,0 +1,128 @@
+"""
+Scheduled weather collector service
+Samples configured locations at a fixed interval into an append-only
+Parquet store, so time-series datasets are served without upstream calls
+"""
+
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import pandas as pd
+from config.config import config
+from app.services.openweather_service import OpenWeatherService
+
+class WeatherCollector:
+    """Background sampler that appends weather observations to columnar storage"""
+    
+    def __init__(self, weather_service: Optional[OpenWeatherService] = None):
+        self.weather_service = weather_service or OpenWeatherService()
+        self.store_dir = Path(config.WEATHER_SERIES_DIR)
+        self.locations = [location.strip() for location in config.WEATHER_COLLECTOR_LOCATIONS.split(";") if location.strip()]
+        self.interval = config.WEATHER_COLLECTOR_INTERVAL
+        self.last_run: Optional[str] = None
+        self.last_error: Optional[str] = None
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self) -> None:
+        """Start sampling in a background thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+    
+    def stop(self) -> None:
+        """Stop the sampler after the current round"""
+        self._stop_event.set()
+    
+    def get_status(self) -> Dict[str, Any]:
+        """Get collector configuration and health"""
+        return {
+            "running": bool(self._thread and self._thread.is_alive()),
+            "locations": self.locations,
+            "interval_seconds": self.interval,
+            "last_run": self.last_run,
+            "last_error": self.last_error
+        }
+    
+    def collect_once(self) -> Dict[str, Any]:
+        """Sample every configured location once and append the rows to the store"""
+        if not self.locations:
+            return {"error": "No collector locations configured"}
+        
+        cities, coordinates = [], []
+        for location in self.locations:
+            try:
+                self.weather_service.normalize_location(location, is_coordinates=True)
+                coordinates.append(location)
+            except ValueError:
+                cities.append(location)
+        
+        # Bypass the spatial cache: it would hand back older or neighbouring observations
+        batch = self.weather_service.get_weather_batch(cities, coordinates, use_cache=False)
+        if "error" in batch:
+            self.last_error = batch.get("message") or batch["error"]
+            return batch
+        
+        sampled_at = datetime.now().replace(microsecond=0)
+        rows = [row for row in batch["rows"] if not row["error"]]
+        for row in rows:
+            row.pop("error")
+            # observed_at is the upstream measurement time; samples can repeat it between updates
+            row["observed_at"] = pd.to_datetime(row["observed_at"] or None)
+            row["sampled_at"] = sampled_at
+        
+        if rows:
+            self._append(rows, sampled_at)
+        self.last_run = sampled_at.isoformat()
+        self.last_error = None if len(rows) == len(batch["rows"]) else f"{batch['failed']} location(s) failed"
+        
+        return {"sampled_at": self.last_run, "rows_written": len(rows), "failed": batch["failed"]}
+    
+    def read_series(self, start: datetime, end: datetime, location: Optional[str] = None) -> pd.DataFrame:
+        """Read stored observations between start and end (inclusive) from local storage only"""
+        parts = []
+        day = start.date()
+        while day <= end.date():
+            parts.extend(sorted((self.store_dir / f"date={day.isoformat()}").glob("*.parquet")))
+            day += timedelta(days=1)
+        
+        if not parts:
+            return pd.DataFrame()
+        
+        series = pd.concat((pd.read_parquet(part) for part in parts), ignore_index=True)
+        mask = (series["sampled_at"] >= start) & (series["sampled_at"] <= end)
+        if location:
+            needle = location.strip().casefold()
+            mask &= (series["query"].str.casefold() == needle) | (series["location"].str.casefold() == needle)
+        return series[mask].sort_values(["sampled_at", "query"]).reset_index(drop=True)
+    
+    def _append(self, rows: List[Dict[str, Any]], sampled_at: datetime) -> None:
+        """Write one immutable part file into the day's partition"""
+        partition = self.store_dir / f"date={sampled_at.date().isoformat()}"
+        partition.mkdir(parents=True, exist_ok=True)
+        # Manual and scheduled samples can land in the same second; never overwrite a part
+        part_path = partition / f"part-{sampled_at.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}.parquet"
+        temp_path = part_path.with_suffix(".tmp")
+        pd.DataFrame(rows).to_parquet(temp_path, index=False)
+        temp_path.replace(part_path)
+    
+    def _run(self) -> None:
+        """Sample on a fixed schedule until stopped"""
+        next_run = time.monotonic()
+        while not self._stop_event.is_set():
+            try:
+                self.collect_once()
+            except Exception as e:
+                self.last_error = str(e)
+            
+            # Schedule from the planned start so sampling does not drift
+            next_run += self.interval
+            self._stop_event.wait(max(0.0, next_run - time.monotonic()))
+
+# Shared by the app lifecycle hooks and the routes
+weather_collector = WeatherCollector()
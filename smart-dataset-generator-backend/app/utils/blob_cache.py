@@ -0,0 +1,165 @@
+"""
+On-disk blob cache for Smart Dataset Generator
+Stores downloaded images by photo id and size variant with an LRU size cap
+"""
+
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+import requests
+from config.config import config
+
+class BlobCache:
+    """Thread-safe LRU file cache; recency survives restarts through file mtimes"""
+    
+    def __init__(self, root: str, max_bytes: int):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Path, int]" = OrderedDict()
+        self._total_bytes = 0
+        self._loaded = False
+        self._lock = threading.Lock()
+        # Per-blob download lock and the number of callers holding or waiting on it
+        self._key_locks: Dict[Path, list] = {}
+        # Blobs handed out with pin=True and not yet released; eviction skips them
+        self._pins: Dict[Path, int] = {}
+    
+    def path_for(self, photo_id: int, variant: str) -> Path:
+        """Blob location for a photo variant, fanned out so no directory grows too large"""
+        return self.root / variant / f"{int(photo_id) % 256:02x}" / f"{photo_id}.bin"
+    
+    def get(self, photo_id: int, variant: str, pin: bool = False) -> Optional[Path]:
+        """Return the cached blob path and mark it recently used, or None.
+        With pin=True the blob is not evicted until release(path) is called.
+        """
+        path = self.path_for(photo_id, variant)
+        with self._lock:
+            self._ensure_loaded()
+            if path not in self._entries:
+                return None
+            self._entries.move_to_end(path)
+            if pin:
+                self._pins[path] = self._pins.get(path, 0) + 1
+        try:
+            os.utime(path)
+        except OSError:
+            if pin:
+                self.release(path)
+            return None
+        return path
+    
+    def fetch(self, photo_id: int, variant: str, url: str, timeout: int = 30,
+              pin: bool = False) -> Optional[Path]:
+        """Return the cached blob, downloading it once if missing.
+        Concurrent callers for the same blob wait for a single download. Callers
+        that read the file after other downloads may run pass pin=True and
+        release(path) when done, so eviction cannot delete it underneath them.
+        """
+        path = self.get(photo_id, variant, pin)
+        if path:
+            return path
+        
+        target = self.path_for(photo_id, variant)
+        # The key lock is shared by everyone waiting on it and dropped by the last one out
+        with self._lock:
+            key_lock = self._key_locks.setdefault(target, [threading.Lock(), 0])
+            key_lock[1] += 1
+        try:
+            with key_lock[0]:
+                path = self.get(photo_id, variant, pin)
+                if path:
+                    return path
+                
+                target.parent.mkdir(parents=True, exist_ok=True)
+                temp_path = target.with_suffix(f".{threading.get_ident()}.tmp")
+                with requests.get(url, stream=True, timeout=timeout) as response:
+                    response.raise_for_status()
+                    with open(temp_path, "wb") as handle:
+                        for chunk in response.iter_content(chunk_size=1 << 16):
+                            handle.write(chunk)
+                os.replace(temp_path, target)
+                self._add(target, pin)
+                return target
+        except Exception as e:
+            print(f"Warning: Could not download image {url}: {e}")
+            return None
+        finally:
+            with self._lock:
+                key_lock[1] -= 1
+                if not key_lock[1]:
+                    del self._key_locks[target]
+    
+    def stats(self) -> Dict[str, int]:
+        """Number of blobs and bytes currently cached"""
+        with self._lock:
+            self._ensure_loaded()
+            return {"blobs": len(self._entries), "bytes": self._total_bytes, "max_bytes": self.max_bytes}
+    
+    def release(self, path: Path) -> None:
+        """Unpin a blob returned with pin=True and evict whatever it kept over the cap"""
+        with self._lock:
+            count = self._pins.pop(path, 0) - 1
+            if count > 0:
+                self._pins[path] = count
+            self._evict()
+    
+    def _add(self, path: Path, pin: bool = False) -> None:
+        """Account for a new blob and evict least recently used blobs over the cap"""
+        size = path.stat().st_size
+        with self._lock:
+            self._ensure_loaded()
+            self._total_bytes += size - self._entries.pop(path, 0)
+            self._entries[path] = size
+            if pin:
+                self._pins[path] = self._pins.get(path, 0) + 1
+            self._evict(keep=path)
+    
+    def _evict(self, keep: Optional[Path] = None) -> None:
+        """Delete least recently used unpinned blobs until under the cap (caller holds the lock).
+        Pinned blobs may keep the cache over the cap until they are released.
+        """
+        for path in list(self._entries):
+            if self._total_bytes <= self.max_bytes or len(self._entries) <= 1:
+                break
+            if path == keep or path in self._pins:
+                continue
+            self._total_bytes -= self._entries.pop(path)
+            try:
+                path.unlink()
+            except OSError:
+                pass
+    
+    def _ensure_loaded(self) -> None:
+        """Index existing blobs by mtime once (caller holds the lock)"""
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self.root.exists():
+            return
+        
+        blobs = []
+        for path in self.root.glob("*/*/*.bin"):
+            stat = path.stat()
+            blobs.append((stat.st_mtime, path, stat.st_size))
+        for _, path, size in sorted(blobs):
+            self._entries[path] = size
+            self._total_bytes += size
+
+def link_or_copy(source: Path, destination: Path) -> None:
+    """Hard-link source to destination, copying when links are not possible"""
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = destination.with_suffix(destination.suffix + ".tmp")
+    if temp_path.exists():
+        temp_path.unlink()
+    try:
+        os.link(source, temp_path)
+    except OSError:
+        # Different filesystem or no hard-link support
+        shutil.copyfile(source, temp_path)
+    os.replace(temp_path, destination)
+
+# Shared by every image export so overlapping requests reuse downloads
+image_blob_cache = BlobCache(config.IMAGE_CACHE_DIR, config.IMAGE_CACHE_MAX_BYTES)
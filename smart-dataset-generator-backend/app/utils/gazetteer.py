@@ -0,0 +1,103 @@
+"""
+City gazetteer for Smart Dataset Generator
+Resolves free-text city names to canonical cities from a bundled table
+"""
+
+import csv
+import re
+import unicodedata
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+CITIES_FILE = Path(__file__).resolve().parent.parent / "data" / "cities.csv"
+
+def normalize_place_name(name: str) -> str:
+    """Normalize a place name for lookup: strip accents and punctuation, casefold, collapse spaces"""
+    decomposed = unicodedata.normalize("NFKD", name)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    cleaned = re.sub(r"[^\w\s]", " ", stripped.casefold())
+    return " ".join(cleaned.split())
+
+class CityGazetteer:
+    """Sorted-array index over canonical and alternate city names.
+    City attributes are kept in parallel columns so the index stays compact.
+    """
+    
+    def __init__(self, cities_file: Path = CITIES_FILE):
+        self.ids: List[str] = []
+        self.names: List[str] = []
+        self.countries: List[str] = []
+        self.lats = array("d")
+        self.lons = array("d")
+        self.populations = array("q")
+        
+        pairs = []
+        with open(cities_file, newline="", encoding="utf-8") as handle:
+            for position, row in enumerate(csv.DictReader(handle)):
+                self.ids.append(row["id"])
+                self.names.append(row["name"])
+                self.countries.append(row["country"].upper())
+                self.lats.append(float(row["lat"]))
+                self.lons.append(float(row["lon"]))
+                self.populations.append(int(row["population"] or 0))
+                
+                aliases = [row["name"]] + [alias for alias in row["alternate_names"].split("|") if alias]
+                for key in {normalize_place_name(alias) for alias in aliases}:
+                    pairs.append((key, position))
+        
+        pairs.sort()
+        self._keys = [key for key, _ in pairs]
+        self._positions = array("i", [position for _, position in pairs])
+    
+    def resolve(self, city: str, country_code: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Resolve 'City' or 'City,CC' to a canonical city, preferring the most populous match"""
+        if country_code is None and "," in city:
+            city, _, country_code = city.partition(",")
+        country_code = (country_code or "").strip().upper() or None
+        
+        key = normalize_place_name(city)
+        if not key:
+            return None
+        
+        candidates = set()
+        index = bisect_left(self._keys, key)
+        while index < len(self._keys) and self._keys[index] == key:
+            position = self._positions[index]
+            if country_code is None or self.countries[position] == country_code:
+                candidates.add(position)
+            index += 1
+        
+        if not candidates:
+            return None
+        return self._city(max(candidates, key=lambda position: self.populations[position]))
+    
+    def autocomplete(self, prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Return cities whose canonical or alternate names start with prefix, most populous first"""
+        key = normalize_place_name(prefix)
+        if not key:
+            return []
+        
+        matches = set()
+        index = bisect_left(self._keys, key)
+        while index < len(self._keys) and self._keys[index].startswith(key):
+            matches.add(self._positions[index])
+            index += 1
+        
+        ranked = sorted(matches, key=lambda position: self.populations[position], reverse=True)
+        return [self._city(position) for position in ranked[:limit]]
+    
+    def _city(self, position: int) -> Dict[str, Any]:
+        """Build the public record for the city at position"""
+        return {
+            "id": self.ids[position],
+            "name": self.names[position],
+            "country": self.countries[position],
+            "lat": self.lats[position],
+            "lon": self.lons[position],
+            "population": self.populations[position]
+        }
+
+# Loaded once at import; the bundled table is small and read-only
+gazetteer = CityGazetteer()
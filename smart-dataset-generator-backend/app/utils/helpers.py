@@ -8,11 +8,17 @@ import json
 import csv
 import pandas as pd
 import tempfile
+import io
 import zipfile
-from typing import Any, Dict, List, Optional, Union
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Union
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 from datetime import datetime, timedelta
 import requests
 from pathlib import Path
+from app.utils.blob_cache import image_blob_cache
+from app.utils.image_utils import HASH_TYPES, IMAGE_FORMATS, find_near_duplicates, prepare_images
+from app.utils.text_utils import NEAR_DUPLICATE_DISTANCE, cluster_near_duplicates, weighted_features
 
 def create_temp_file(extension: str = ".json") -> str:
     """Create a temporary file and return its path"""
@@ -51,7 +57,7 @@ def validate_date_range(start_date: str, end_date: str) -> bool:
 
 def format_weather_data(data: Dict[str, Any]) -> Dict[str, Any]:
     """Format weather data for consistent output"""
-    if not data or "main" not in data:
+    if not data or ("main" not in data and "list" not in data):
         return {"error": "Invalid weather data"}
     
     # Handle both current weather and forecast data
@@ -93,9 +99,104 @@ def format_weather_data(data: Dict[str, Any]) -> Dict[str, Any]:
                 "speed": data.get("wind", {}).get("speed", 0),
                 "direction": data.get("wind", {}).get("deg", 0)
             },
+            # When OpenWeather measured the values, as opposed to when they were retrieved
+            "observed_at": datetime.fromtimestamp(data["dt"]).isoformat() if data.get("dt") else "",
             "timestamp": datetime.now().isoformat()
         }
 
+def flatten_weather_data(formatted: Dict[str, Any]) -> Dict[str, Any]:
+    """Flatten formatted current weather into a single table row"""
+    temperature = formatted.get("temperature", {})
+    weather = formatted.get("weather", {})
+    wind = formatted.get("wind", {})
+    
+    return {
+        "location": formatted.get("location", ""),
+        "country": formatted.get("country", ""),
+        "temperature": temperature.get("current"),
+        "feels_like": temperature.get("feels_like"),
+        "temp_min": temperature.get("min"),
+        "temp_max": temperature.get("max"),
+        "humidity": formatted.get("humidity"),
+        "pressure": formatted.get("pressure"),
+        "weather_main": weather.get("main", ""),
+        "weather_description": weather.get("description", ""),
+        "wind_speed": wind.get("speed"),
+        "wind_direction": wind.get("direction"),
+        "observed_at": formatted.get("observed_at", ""),
+        "timestamp": formatted.get("timestamp", "")
+    }
+
+def format_forecast_table(data: Dict[str, Any]) -> pd.DataFrame:
+    """Format a 3-hourly OpenWeather forecast into a typed, columnar DataFrame.
+    Timestamps are converted to the city's local time using its UTC offset.
+    """
+    entries = data.get("list") if data else None
+    if not entries:
+        return pd.DataFrame()
+    
+    raw = pd.json_normalize(entries)
+    city = data.get("city", {})
+    offset = pd.to_timedelta(city.get("timezone", 0), unit="s")
+    
+    def column(name: str) -> pd.Series:
+        return raw[name] if name in raw else pd.Series(float("nan"), index=raw.index)
+    
+    weather = raw["weather"].str[0] if "weather" in raw else pd.Series([{}] * len(raw))
+    
+    table = pd.DataFrame({
+        "time": pd.to_datetime(raw["dt"], unit="s") + offset,
+        "location": city.get("name", "Unknown"),
+        "temperature": column("main.temp").astype("float64"),
+        "feels_like": column("main.feels_like").astype("float64"),
+        "temp_min": column("main.temp_min").astype("float64"),
+        "temp_max": column("main.temp_max").astype("float64"),
+        "humidity": column("main.humidity").astype("float64"),
+        "pressure": column("main.pressure").astype("float64"),
+        "weather_main": weather.str.get("main").astype("string"),
+        "weather_description": weather.str.get("description").astype("string"),
+        "cloud_cover": column("clouds.all").astype("float64"),
+        "wind_speed": column("wind.speed").astype("float64"),
+        "wind_direction": column("wind.deg").astype("float64"),
+        "precipitation_probability": column("pop").astype("float64"),
+        "rain_3h": column("rain.3h").astype("float64").fillna(0.0),
+        "snow_3h": column("snow.3h").astype("float64").fillna(0.0)
+    })
+    table["date"] = table["time"].dt.date
+    return table
+
+def aggregate_daily_forecast(table: pd.DataFrame) -> pd.DataFrame:
+    """Aggregate a forecast table into one row per local calendar day"""
+    if table.empty:
+        return table
+    
+    daily = table.groupby(["location", "date"], sort=True).agg(
+        temp_min=("temp_min", "min"),
+        temp_max=("temp_max", "max"),
+        temp_mean=("temperature", "mean"),
+        humidity_mean=("humidity", "mean"),
+        pressure_mean=("pressure", "mean"),
+        wind_speed_max=("wind_speed", "max"),
+        precipitation_probability_max=("precipitation_probability", "max"),
+        rain_total=("rain_3h", "sum"),
+        snow_total=("snow_3h", "sum"),
+        weather_main=("weather_main", lambda values: values.mode().iat[0] if values.notna().any() else None),
+        samples=("time", "count")
+    ).reset_index()
+    return daily.round(2)
+
+def dataframe_to_records(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Convert a DataFrame to JSON-safe records (ISO timestamps, None for missing values)"""
+    if df.empty:
+        return []
+    
+    converted = df.copy()
+    for name in converted.columns:
+        if pd.api.types.is_datetime64_any_dtype(converted[name]):
+            converted[name] = converted[name].dt.strftime("%Y-%m-%dT%H:%M:%S")
+    converted = converted.astype(object).where(converted.notna(), None)
+    return converted.to_dict(orient="records")
+
 def format_stock_data(data: Dict[str, Any]) -> Dict[str, Any]:
     """Format stock data for consistent output.
     Returns up to 50 most recent entries sorted by date descending.
@@ -159,6 +260,68 @@ def format_news_data(data: Dict[str, Any]) -> Dict[str, Any]:
         "articles": formatted_articles
     }
 
+def format_fan_out_news(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Format merged fan-out results, adding pipe-separated attribution columns"""
+    formatted_data = format_news_data(data)
+    for article, raw in zip(formatted_data.get("articles", []), data.get("articles", [])):
+        article["matched_keywords"] = "|".join(raw.get("matchedKeywords", []))
+        article["matched_domains"] = "|".join(raw.get("matchedDomains", []))
+    return formatted_data
+
+TRACKING_PARAMS = {"fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "cmpid", "ocid", "ref", "ref_src", "smid", "sr_share"}
+
+def canonicalize_url(url: str) -> str:
+    """Canonicalize an article URL so syndicated copies of one link compare equal.
+    Drops tracking parameters, fragments, default ports, 'www.' and trailing slashes.
+    """
+    if not url:
+        return ""
+    
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    )
+    path = parts.path.rstrip("/") or "/"
+    
+    return urlunsplit(("https", host, path, urlencode(query), ""))
+
+def dedupe_articles(articles: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Drop raw NewsAPI articles whose canonical URL was already seen, keeping the first"""
+    seen = set()
+    unique = []
+    for article in articles:
+        key = canonicalize_url(article.get("url", "")) or id(article)
+        if key in seen:
+            continue
+        seen.add(key)
+        unique.append(article)
+    return unique
+
+def mark_near_duplicates(articles: List[Dict[str, Any]], drop: bool = False,
+                         max_distance: int = NEAR_DUPLICATE_DISTANCE) -> List[Dict[str, Any]]:
+    """Add a duplicate_cluster id to formatted articles using weighted SimHash over title and description.
+    With drop=True only the first article of each cluster is kept.
+    """
+    documents = [weighted_features(article.get("title") or "", article.get("description") or "") for article in articles]
+    roots = cluster_near_duplicates(documents, max_distance)
+    
+    cluster_ids: Dict[int, int] = {}
+    marked = []
+    for article, root in zip(articles, roots):
+        is_first = root not in cluster_ids
+        cluster_id = cluster_ids.setdefault(root, len(cluster_ids))
+        if drop and not is_first:
+            continue
+        marked.append({**article, "duplicate_cluster": cluster_id})
+    return marked
+
 def format_image_data(data: Dict[str, Any]) -> Dict[str, Any]:
     """Format image data for consistent output"""
     if not data or "photos" not in data:
@@ -168,26 +331,66 @@ def format_image_data(data: Dict[str, Any]) -> Dict[str, Any]:
     formatted_photos = []
     
     for photo in photos:
-        formatted_photos.append({
+        formatted_photo = {
             "id": photo.get("id", 0),
             "width": photo.get("width", 0),
             "height": photo.get("height", 0),
             "url": photo.get("url", ""),
             "photographer": photo.get("photographer", ""),
             "photographer_url": photo.get("photographer_url", ""),
+            "photographer_id": photo.get("photographer_id"),
+            "avg_color": photo.get("avg_color", ""),
+            "alt": photo.get("alt", ""),
             "src": {
                 "original": photo.get("src", {}).get("original", ""),
                 "large": photo.get("src", {}).get("large", ""),
                 "medium": photo.get("src", {}).get("medium", ""),
                 "small": photo.get("src", {}).get("small", "")
             }
-        })
+        }
+        # Category searches record which category terms returned the photo
+        if "matched_terms" in photo:
+            formatted_photo["matched_terms"] = photo["matched_terms"]
+        formatted_photos.append(formatted_photo)
     
     return {
         "total_results": data.get("total_results", 0),
         "photos": formatted_photos
     }
 
+def format_video_data(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Format video search data for consistent output"""
+    if not data or "videos" not in data:
+        return {"error": "Invalid video data"}
+    
+    formatted_videos = []
+    for video in data.get("videos", []):
+        formatted_videos.append({
+            "id": video.get("id", 0),
+            "width": video.get("width", 0),
+            "height": video.get("height", 0),
+            "duration": video.get("duration", 0),
+            "url": video.get("url", ""),
+            "image": video.get("image", ""),
+            "user": (video.get("user") or {}).get("name", ""),
+            "video_files": [
+                {
+                    "quality": item.get("quality"),
+                    "file_type": item.get("file_type"),
+                    "width": item.get("width"),
+                    "height": item.get("height"),
+                    "fps": item.get("fps"),
+                    "link": item.get("link", "")
+                }
+                for item in video.get("video_files", [])
+            ]
+        })
+    
+    return {
+        "total_results": data.get("total_results", 0),
+        "videos": formatted_videos
+    }
+
 def save_to_csv(data: List[Dict[str, Any]], filename: str) -> str:
     """Save data to CSV file"""
     if not data:
@@ -204,6 +407,19 @@ def save_to_csv(data: List[Dict[str, Any]], filename: str) -> str:
     
     return file_path
 
+def iter_csv(rows: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """Yield CSV text row by row for streaming responses (header from the first row)"""
+    buffer = io.StringIO()
+    writer = None
+    for row in rows:
+        if writer is None:
+            writer = csv.DictWriter(buffer, fieldnames=list(row.keys()), extrasaction="ignore")
+            writer.writeheader()
+        writer.writerow(row)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+
 def save_to_json(data: Union[Dict[str, Any], List[Dict[str, Any]]], filename: str) -> str:
     """Save data to JSON file"""
     file_path = create_temp_file(".json")
@@ -224,24 +440,106 @@ def save_to_parquet(data: List[Dict[str, Any]], filename: str) -> str:
     
     return file_path
 
-def download_images(image_urls: List[str], filename: str) -> str:
-    """Download images and create ZIP file"""
+def download_images(image_urls: List[str], filename: str, processing: Optional[Dict[str, Any]] = None,
+                    max_workers: int = 2, dedup_distance: Optional[int] = None,
+                    hash_type: str = "phash", max_images: int = 10,
+                    cache_keys: Optional[List[Optional[tuple]]] = None, features: bool = False) -> str:
+    """Download images and create ZIP file.
+    With processing options (see image_utils.process_image) images are resized
+    and re-encoded on a process pool before being written. With dedup_distance,
+    images whose perceptual hash is within that many bits of an earlier image
+    are dropped and every hash is recorded in manifest.csv. Images with a
+    (photo_id, variant) cache key are served from the on-disk blob cache and
+    copied into the archive straight from the cached file. With features,
+    color, brightness, contrast and aspect features of each original image
+    are written to features.parquet.
+    """
     if not image_urls:
         raise ValueError("No image URLs provided")
     
-    zip_path = create_temp_file(".zip")
+    urls = image_urls[:max_images]
+    keys = (cache_keys or [])[:max_images]
+    keys += [None] * (len(urls) - len(keys))
+    
+    def fetch(index: int) -> Optional[Union[Path, bytes]]:
+        url = urls[index]
+        if keys[index]:
+            return image_blob_cache.fetch(*keys[index], url, pin=True)
+        try:
+            response = requests.get(url, timeout=30)
+            if response.status_code == 200:
+                return response.content
+        except Exception as e:
+            print(f"Warning: Could not download image {url}: {e}")
+        return None
     
-    with zipfile.ZipFile(zip_path, 'w') as zip_file:
-        for i, url in enumerate(image_urls[:10]):  # Limit to 10 images
-            try:
-                response = requests.get(url, timeout=30)
-                if response.status_code == 200:
-                    image_name = f"image_{i+1}.jpg"
-                    zip_file.writestr(image_name, response.content)
-            except Exception as e:
-                print(f"Warning: Could not download image {url}: {e}")
+    # Cached blobs stay pinned until they are in the archive so eviction cannot remove them
+    sources = run_concurrently(fetch, list(range(len(urls))), max_workers=8)
+    try:
+        hashing = dedup_distance is not None
+        
+        downloaded = [(url, source) for url, source in zip(urls, sources) if source is not None]
+        payloads = [source for _, source in downloaded]
+        if processing or hashing or features:
+            payloads = [source.read_bytes() if isinstance(source, Path) else source for source in payloads]
+        prepared = prepare_images(payloads, max_workers, processing, hashing, features)
+        for (url, _), result in zip(downloaded, prepared):
+            if result["error"]:
+                print(f"Warning: Could not process image {url}: {result['error']}")
+        
+        duplicate_of: List[Optional[int]] = [None] * len(prepared)
+        if hashing:
+            duplicate_of = find_near_duplicates(
+                [result["hashes"][hash_type] if result["hashes"] else None for result in prepared], dedup_distance
+            )
+        
+        extension = IMAGE_FORMATS[processing.get("image_format", "jpeg")][1] if processing else ".jpg"
+        names = [f"image_{i+1}{extension}" for i in range(len(prepared))]
+        zip_path = create_temp_file(".zip")
+        manifest = []
+        feature_rows = []
+        
+        with zipfile.ZipFile(zip_path, 'w') as zip_file:
+            for i, ((url, _), result) in enumerate(zip(downloaded, prepared)):
+                if result["data"] is not None and duplicate_of[i] is None:
+                    if isinstance(result["data"], Path):
+                        zip_file.write(result["data"], names[i])
+                    else:
+                        zip_file.writestr(names[i], result["data"])
+                
+                if hashing:
+                    hashes = result["hashes"] or {}
+                    manifest.append({
+                        "file": names[i] if result["data"] is not None and duplicate_of[i] is None else "",
+                        "url": url,
+                        "status": "failed" if result["data"] is None else "duplicate" if duplicate_of[i] is not None else "kept",
+                        "duplicate_of": names[duplicate_of[i]] if duplicate_of[i] is not None else "",
+                        **{name: f"{hashes[name]:016x}" if name in hashes else "" for name in HASH_TYPES}
+                    })
+                
+                if result["features"] and duplicate_of[i] is None:
+                    feature_rows.append({"file": names[i], "url": url, **result["features"]})
+            
+            if manifest:
+                zip_file.writestr("manifest.csv", "".join(iter_csv(manifest)))
+            if feature_rows:
+                buffer = io.BytesIO()
+                pd.DataFrame(feature_rows).to_parquet(buffer, index=False)
+                zip_file.writestr("features.parquet", buffer.getvalue())
+        
+        return zip_path
+    finally:
+        for source in sources:
+            if isinstance(source, Path):
+                image_blob_cache.release(source)
+
+def run_concurrently(func: Callable[[Any], Any], items: List[Any], max_workers: int = 8) -> List[Any]:
+    """Apply func to every item on a thread pool, returning results in input order"""
+    if not items:
+        return []
     
-    return zip_path
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(items)))) as executor:
+        return list(executor.map(func, items))
 
 def validate_api_response(response: requests.Response) -> bool:
     """Validate API response"""
@@ -0,0 +1,234 @@
+"""
+Image processing utilities for Smart Dataset Generator
+Resize, crop, letterbox, re-encode, perceptually hash and extract color and
+contrast features from images on a process pool
+"""
+
+import io
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from PIL import Image, ImageOps
+
+FIT_MODES = ("resize", "crop", "letterbox")
+IMAGE_FORMATS = {"jpeg": ("JPEG", ".jpg"), "webp": ("WEBP", ".webp"), "png": ("PNG", ".png")}
+HASH_TYPES = ("ahash", "dhash", "phash")
+
+# Feature extraction works on a thumbnail no larger than this
+FEATURE_SIZE = 64
+DOMINANT_COLORS = 3
+# Upper width/height ratio of each aspect bucket
+ASPECT_BUCKETS = ((0.8, "portrait"), (1.25, "square"), (2.0, "landscape"), (float("inf"), "panorama"))
+# Gradient magnitude bin edges for the contrast histogram (luma units per pixel)
+CONTRAST_EDGES = np.array([0, 2, 4, 8, 16, 32, 64, 128, np.inf])
+LUMA_WEIGHTS = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+def _dct_matrix(size: int) -> np.ndarray:
+    """Orthonormal DCT-II basis, so a 2-D DCT is two matrix products"""
+    k = np.arange(size)[:, None]
+    n = np.arange(size)[None, :]
+    matrix = np.sqrt(2.0 / size) * np.cos(np.pi * (2 * n + 1) * k / (2 * size))
+    matrix[0] /= np.sqrt(2.0)
+    return matrix
+
+DCT_32 = _dct_matrix(32)
+POPCOUNT_8 = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
+def validate_image_options(width: Optional[int], height: Optional[int], fit: str,
+                           image_format: str, quality: int) -> Optional[str]:
+    """Return an error message for invalid processing options, or None"""
+    if fit not in FIT_MODES:
+        return f"fit must be one of {', '.join(FIT_MODES)}"
+    if image_format not in IMAGE_FORMATS:
+        return f"format must be one of {', '.join(IMAGE_FORMATS)}"
+    if not 1 <= quality <= 100:
+        return "quality must be between 1 and 100"
+    for value in (width, height):
+        if value is not None and not 1 <= value <= 8192:
+            return "width and height must be between 1 and 8192"
+    if fit != "resize" and not (width and height):
+        return f"fit={fit} needs both width and height"
+    return None
+
+def process_image(payload: bytes, width: Optional[int] = None, height: Optional[int] = None,
+                  fit: str = "resize", image_format: str = "jpeg", quality: int = 85,
+                  background: Tuple[int, int, int] = (0, 0, 0)) -> bytes:
+    """Resize and re-encode one image.
+    resize keeps the aspect ratio within width x height, crop center-crops to
+    exactly width x height, letterbox pads to exactly width x height.
+    """
+    image = Image.open(io.BytesIO(payload))
+    if width or height:
+        # Let the JPEG decoder downscale by a power of two instead of decoding full size
+        image.draft("RGB", (width or image.width, height or image.height))
+    image = ImageOps.exif_transpose(image)
+    
+    pil_format, _ = IMAGE_FORMATS[image_format]
+    if pil_format == "JPEG" or image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGB")
+    
+    if width and height:
+        if fit == "crop":
+            image = ImageOps.fit(image, (width, height), Image.LANCZOS)
+        elif fit == "letterbox":
+            image = ImageOps.pad(image, (width, height), Image.LANCZOS, color=background)
+        else:
+            image.thumbnail((width, height), Image.LANCZOS)
+    elif width or height:
+        # One side given: round the other one instead of fitting a floored box, and never upscale
+        scale = width / image.width if width else height / image.height
+        if scale < 1:
+            image = image.resize((width or max(1, round(image.width * scale)),
+                                  height or max(1, round(image.height * scale))), Image.LANCZOS)
+    
+    output = io.BytesIO()
+    options: Dict[str, Any] = {"quality": quality} if pil_format in ("JPEG", "WEBP") else {"optimize": True}
+    if pil_format == "JPEG":
+        options["optimize"] = True
+    image.save(output, pil_format, **options)
+    return output.getvalue()
+
+def _bits_to_int(bits: np.ndarray) -> int:
+    """Pack a 64-element boolean array into an integer, first element as the high bit"""
+    return int.from_bytes(np.packbits(bits.ravel()).tobytes(), "big")
+
+def perceptual_hashes(payload: bytes) -> Dict[str, int]:
+    """Compute 64-bit average, difference and DCT hashes from downscaled grayscale pixels"""
+    image = Image.open(io.BytesIO(payload))
+    image.draft("L", (64, 64))
+    gray = ImageOps.exif_transpose(image).convert("L")
+    
+    small = np.asarray(gray.resize((8, 8), Image.BILINEAR), dtype=np.float64)
+    wide = np.asarray(gray.resize((9, 8), Image.BILINEAR), dtype=np.float64)
+    pixels = np.asarray(gray.resize((32, 32), Image.BILINEAR), dtype=np.float64)
+    
+    # Low-frequency 8x8 block of the 2-D DCT, thresholded at its median (DC term excluded)
+    low = (DCT_32 @ pixels @ DCT_32.T)[:8, :8].ravel()
+    return {
+        "ahash": _bits_to_int(small > small.mean()),
+        "dhash": _bits_to_int(wide[:, 1:] > wide[:, :-1]),
+        "phash": _bits_to_int(low > np.median(low[1:]))
+    }
+
+def find_near_duplicates(hashes: List[Optional[int]], max_distance: int) -> List[Optional[int]]:
+    """For each hash, the index of an earlier kept hash within max_distance bits, else None.
+    Each candidate is compared against all kept hashes in one vectorized XOR/popcount.
+    """
+    kept = np.zeros(len(hashes), dtype=np.uint64)
+    kept_index = np.zeros(len(hashes), dtype=np.int64)
+    kept_count = 0
+    duplicate_of: List[Optional[int]] = []
+    
+    for index, value in enumerate(hashes):
+        if value is None:
+            duplicate_of.append(None)
+            continue
+        
+        if kept_count:
+            xor = kept[:kept_count] ^ np.uint64(value)
+            distances = POPCOUNT_8[xor.view(np.uint8)].reshape(kept_count, 8).sum(axis=1)
+            match = int(np.argmin(distances))
+            if distances[match] <= max_distance:
+                duplicate_of.append(int(kept_index[match]))
+                continue
+        
+        kept[kept_count] = value
+        kept_index[kept_count] = index
+        kept_count += 1
+        duplicate_of.append(None)
+    
+    return duplicate_of
+
+def image_features(payload: bytes) -> Dict[str, Any]:
+    """Pixel-derived features from a small thumbnail, as flat columns.
+    Dominant colors come from a 64-bin (4 levels per channel) color histogram,
+    contrast from a histogram of luma gradient magnitudes.
+    """
+    image = Image.open(io.BytesIO(payload))
+    image.draft("RGB", (FEATURE_SIZE * 2, FEATURE_SIZE * 2))
+    image = ImageOps.exif_transpose(image).convert("RGB")
+    aspect_ratio = image.width / image.height
+    image.thumbnail((FEATURE_SIZE, FEATURE_SIZE), Image.BILINEAR)
+    
+    pixels = np.asarray(image, dtype=np.float32).reshape(-1, 3)
+    luma = pixels @ LUMA_WEIGHTS
+    gray = luma.reshape(image.height, image.width)
+    gradient = np.hypot(np.diff(gray, axis=1)[:-1], np.diff(gray, axis=0)[:, :-1])
+    brightness_hist = np.histogram(luma, bins=8, range=(0, 256))[0] / luma.size
+    contrast_hist = np.histogram(gradient, bins=CONTRAST_EDGES)[0] / max(gradient.size, 1)
+    
+    codes = (pixels[:, 0] // 64 * 16 + pixels[:, 1] // 64 * 4 + pixels[:, 2] // 64).astype(np.int64)
+    counts = np.bincount(codes, minlength=64)
+    channel_sums = np.stack([np.bincount(codes, weights=pixels[:, channel], minlength=64) for channel in range(3)], axis=1)
+    
+    features: Dict[str, Any] = {
+        "aspect_ratio": round(aspect_ratio, 4),
+        "aspect_bucket": next(name for limit, name in ASPECT_BUCKETS if aspect_ratio < limit),
+        "brightness_mean": round(float(luma.mean()), 2),
+        "contrast_rms": round(float(luma.std()), 2)
+    }
+    features.update({f"brightness_hist_{index}": round(float(value), 4) for index, value in enumerate(brightness_hist)})
+    features.update({f"contrast_hist_{index}": round(float(value), 4) for index, value in enumerate(contrast_hist)})
+    for rank, code in enumerate(np.argsort(counts)[::-1][:DOMINANT_COLORS], start=1):
+        # Report the mean color of the bin rather than its corner
+        if counts[code]:
+            red, green, blue = (channel_sums[code] / counts[code]).round().astype(int)
+            features[f"dominant_color_{rank}"] = f"#{red:02x}{green:02x}{blue:02x}"
+        else:
+            features[f"dominant_color_{rank}"] = ""
+        features[f"dominant_color_{rank}_share"] = round(float(counts[code] / codes.size), 4)
+    return features
+
+def _file_features(path: Path) -> Dict[str, Any]:
+    """Features for one image file in a worker, reporting errors instead of raising"""
+    try:
+        return image_features(Path(path).read_bytes())
+    except Exception as e:
+        return {"feature_error": str(e)}
+
+def extract_features(paths: List[Path], max_workers: int = 2) -> List[Dict[str, Any]]:
+    """Compute image_features for many files in parallel processes, in order.
+    Workers read the files themselves so image bytes never cross process boundaries.
+    """
+    if not paths:
+        return []
+    
+    workers = max(1, min(max_workers, len(paths)))
+    if workers == 1:
+        return [_file_features(path) for path in paths]
+    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_file_features, paths, chunksize=max(1, len(paths) // (workers * 4))))
+
+def _prepare_image(task: tuple) -> Dict[str, Any]:
+    """Hash, extract features from and/or process one image in a worker, reporting errors instead of raising"""
+    payload, processing, hashing, features = task
+    result: Dict[str, Any] = {"data": payload, "hashes": None, "features": None, "error": None}
+    try:
+        if hashing:
+            result["hashes"] = perceptual_hashes(payload)
+        if features:
+            result["features"] = image_features(payload)
+        if processing:
+            result["data"] = process_image(payload, **processing)
+    except Exception as e:
+        result["data"] = None
+        result["error"] = str(e)
+    return result
+
+def prepare_images(payloads: List[bytes], max_workers: int = 2, processing: Optional[Dict[str, Any]] = None,
+                   hashing: bool = False, features: bool = False) -> List[Dict[str, Any]]:
+    """Hash, extract features from and/or process many images in parallel processes.
+    Returns {"data", "hashes", "features", "error"} per input, in order.
+    """
+    if not payloads:
+        return []
+    
+    tasks = [(payload, processing, hashing, features) for payload in payloads]
+    workers = max(1, min(max_workers, len(payloads)))
+    if workers == 1 or not (processing or hashing or features):
+        return [_prepare_image(task) for task in tasks]
+    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_prepare_image, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
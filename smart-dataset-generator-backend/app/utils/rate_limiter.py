@@ -0,0 +1,39 @@
+"""
+Rate limiting utilities for Smart Dataset Generator
+Token bucket shared by worker threads that call rate-limited upstream APIs
+"""
+
+import threading
+import time
+from typing import Optional
+
+class RateLimiter:
+    """Thread-safe token bucket refilled at `rate` tokens every `per` seconds"""
+    
+    def __init__(self, rate: float, per: float = 60.0, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("Rate must be positive")
+        
+        self.fill_rate = rate / per
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self, tokens: float = 1.0) -> None:
+        """Block until `tokens` are available, then consume them"""
+        # Requests larger than the bucket are let through once it is full
+        tokens = min(tokens, self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.fill_rate)
+                self._updated_at = now
+                
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                
+                wait = (tokens - self._tokens) / self.fill_rate
+            
+            time.sleep(wait)
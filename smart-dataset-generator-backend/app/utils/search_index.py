@@ -0,0 +1,132 @@
+"""
+Local full-text search utilities for Smart Dataset Generator
+Persisted, incrementally updated inverted index with BM25 ranking
+"""
+
+import heapq
+import json
+import math
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+from app.utils.helpers import canonicalize_url
+from app.utils.text_utils import STOPWORDS, tokenize
+
+# Standard BM25 parameters; titles are counted twice so headline matches rank first
+BM25_K1 = 1.2
+BM25_B = 0.75
+TITLE_WEIGHT = 2
+
+ARTICLE_FIELDS = ("source", "author", "title", "description", "url", "urlToImage", "publishedAt")
+
+def index_terms(text: str) -> List[str]:
+    """Tokens used for indexing and querying"""
+    return [token for token in tokenize(text) if token not in STOPWORDS]
+
+class ArticleIndex:
+    """Inverted index over NewsAPI articles, keyed by canonical URL.
+    Documents are appended to a JSON-lines log so the index survives restarts
+    and is rebuilt from disk on first use.
+    """
+    
+    def __init__(self, index_dir: str):
+        self.log_path = Path(index_dir) / "articles.jsonl"
+        self.articles: List[Dict[str, Any]] = []
+        self.doc_lengths: List[int] = []
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self._doc_ids: Dict[str, int] = {}
+        self._total_length = 0
+        self._loaded = False
+        self._lock = threading.Lock()
+    
+    def add_articles(self, articles: Iterable[Dict[str, Any]]) -> int:
+        """Index and persist articles whose canonical URL is new; returns the number added"""
+        with self._lock:
+            self._ensure_loaded()
+            new_articles = []
+            for article in articles:
+                key = canonicalize_url(article.get("url") or "")
+                if not key or key in self._doc_ids:
+                    continue
+                record = {field: article.get(field) for field in ARTICLE_FIELDS}
+                self._index(key, record)
+                new_articles.append(record)
+            
+            if new_articles:
+                self.log_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.log_path, "a", encoding="utf-8") as handle:
+                    for record in new_articles:
+                        handle.write(json.dumps(record, ensure_ascii=False) + "\n")
+            return len(new_articles)
+    
+    def search(self, query: str, from_date: Optional[str] = None, to_date: Optional[str] = None,
+               limit: int = 20) -> Dict[str, Any]:
+        """Rank indexed articles against query with BM25.
+        Dates are ISO strings (YYYY-MM-DD or full timestamps) compared against publishedAt;
+        to_date is inclusive of the whole day.
+        """
+        terms = set(index_terms(query))
+        with self._lock:
+            self._ensure_loaded()
+            doc_count = len(self.articles)
+            if not terms or not doc_count:
+                return {"totalResults": 0, "articles": [], "scores": [], "indexed_articles": doc_count}
+            
+            average_length = self._total_length / doc_count
+            scores: Dict[int, float] = {}
+            for term in terms:
+                postings = self.postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, frequency in postings.items():
+                    published_at = self.articles[doc_id].get("publishedAt") or ""
+                    if (from_date and published_at < from_date) or (to_date and published_at[:len(to_date)] > to_date):
+                        continue
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_lengths[doc_id] / average_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * frequency * (BM25_K1 + 1) / (frequency + norm)
+            
+            ranked = heapq.nlargest(limit, scores.items(), key=lambda entry: entry[1])
+            return {
+                "totalResults": len(scores),
+                "articles": [self.articles[doc_id] for doc_id, _ in ranked],
+                "scores": [round(score, 4) for _, score in ranked],
+                "indexed_articles": doc_count
+            }
+    
+    def __len__(self) -> int:
+        with self._lock:
+            self._ensure_loaded()
+            return len(self.articles)
+    
+    def _index(self, key: str, record: Dict[str, Any]) -> None:
+        """Add one document to the in-memory postings (caller holds the lock)"""
+        doc_id = len(self.articles)
+        tokens = index_terms(record.get("title") or "") * TITLE_WEIGHT + index_terms(record.get("description") or "")
+        
+        self._doc_ids[key] = doc_id
+        self.articles.append(record)
+        self.doc_lengths.append(len(tokens))
+        self._total_length += len(tokens)
+        for term, frequency in Counter(tokens).items():
+            self.postings.setdefault(term, {})[doc_id] = frequency
+    
+    def _ensure_loaded(self) -> None:
+        """Replay the on-disk log once (caller holds the lock)"""
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self.log_path.exists():
+            return
+        
+        with open(self.log_path, encoding="utf-8") as handle:
+            for line in handle:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A crash mid-write can leave a truncated final line
+                    continue
+                key = canonicalize_url(record.get("url") or "")
+                if key and key not in self._doc_ids:
+                    self._index(key, record)
@@ -0,0 +1,100 @@
+"""
+Spatial caching utilities for Smart Dataset Generator
+Grid-indexed cache that answers coordinate lookups from nearby observations
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Tuple
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = 111.32
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in kilometres"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+class SpatialCache:
+    """Thread-safe cache of point observations indexed by snapped grid cell.
+    A lookup returns the nearest fresh observation within radius_km.
+    """
+    
+    def __init__(self, grid_degrees: float, radius_km: float, ttl: float, max_entries: int = 10000):
+        self.grid_degrees = grid_degrees
+        self.radius_km = radius_km
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._cells: Dict[Tuple[int, int], Set[int]] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+    
+    def snap(self, lat: float, lon: float) -> Tuple[int, int]:
+        """Snap coordinates to the grid cell that contains them"""
+        return (math.floor(lat / self.grid_degrees), math.floor(lon / self.grid_degrees))
+    
+    def get(self, lat: float, lon: float) -> Optional[Dict[str, Any]]:
+        """Return the nearest fresh observation within the radius, or None.
+        The result carries the observation value and its distance in km.
+        """
+        row, col = self.snap(lat, lon)
+        lat_span = math.ceil(self.radius_km / (self.grid_degrees * KM_PER_DEGREE))
+        # Cells narrow towards the poles, so more of them fit inside the radius
+        lon_km = self.grid_degrees * KM_PER_DEGREE * max(math.cos(math.radians(lat)), 0.01)
+        lon_span = math.ceil(self.radius_km / lon_km)
+        now = time.monotonic()
+        
+        best = None
+        with self._lock:
+            for cell_row in range(row - lat_span, row + lat_span + 1):
+                for cell_col in range(col - lon_span, col + lon_span + 1):
+                    for entry_id in list(self._cells.get((cell_row, cell_col), ())):
+                        _, entry_lat, entry_lon, stored_at, value = self._entries[entry_id]
+                        if now - stored_at > self.ttl:
+                            self._remove(entry_id)
+                            continue
+                        
+                        distance = haversine_km(lat, lon, entry_lat, entry_lon)
+                        if distance <= self.radius_km and (best is None or distance < best[0]):
+                            best = (distance, value)
+        
+        if best is None:
+            return None
+        return {"value": best[1], "distance_km": round(best[0], 3)}
+    
+    def set(self, lat: float, lon: float, value: Any) -> None:
+        """Record an observation, evicting the oldest ones when full"""
+        cell = self.snap(lat, lon)
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = (cell, lat, lon, time.monotonic(), value)
+            self._cells.setdefault(cell, set()).add(entry_id)
+            
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+    
+    def clear(self) -> None:
+        """Drop every cached observation"""
+        with self._lock:
+            self._entries.clear()
+            self._cells.clear()
+    
+    def _remove(self, entry_id: int) -> None:
+        """Remove an entry from both indexes (caller holds the lock)"""
+        cell = self._entries.pop(entry_id)[0]
+        ids = self._cells.get(cell)
+        if ids is not None:
+            ids.discard(entry_id)
+            if not ids:
+                del self._cells[cell]
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
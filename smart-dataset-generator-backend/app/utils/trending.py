@@ -0,0 +1,155 @@
+"""
+Trending topic utilities for Smart Dataset Generator
+Incremental, time-decayed term and bigram counts over observed headlines
+"""
+
+import heapq
+import math
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+from app.utils.text_utils import extract_terms
+
+# Rebase stored weights before exp() grows large enough to lose precision
+MAX_EXPONENT = 50.0
+
+class DecayedCounter:
+    """Counts that halve every half_life seconds, using forward decay.
+    Each increment is stored as exp((t - landmark) / tau), so adding is O(1)
+    and ranking never requires touching every counter to age it.
+    """
+    
+    def __init__(self, half_life: float, max_items: int, top_size: int):
+        self.tau = half_life / math.log(2)
+        self.max_items = max_items
+        self.top_size = top_size
+        self.landmark = time.time()
+        self.weights: Dict[str, float] = {}
+        self.top: List[tuple] = []
+    
+    def add(self, item: str, timestamp: float) -> None:
+        """Count one occurrence of item at timestamp"""
+        exponent = (timestamp - self.landmark) / self.tau
+        if exponent > MAX_EXPONENT:
+            self._rebase(timestamp)
+            exponent = 0.0
+        self.weights[item] = self.weights.get(item, 0.0) + math.exp(exponent)
+    
+    def refresh_top(self) -> None:
+        """Rebuild the cached top list and prune the long tail.
+        Forward decay scales every weight by the same factor over time, so the
+        order stays valid until the next batch of additions.
+        """
+        if len(self.weights) > self.max_items:
+            keep = heapq.nlargest(self.max_items, self.weights.items(), key=lambda entry: entry[1])
+            self.weights = dict(keep)
+        self.top = heapq.nlargest(self.top_size, self.weights.items(), key=lambda entry: entry[1])
+    
+    def most_common(self, limit: int, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Top items with their decayed counts as of now, read from the cached list"""
+        scale = math.exp(-((now or time.time()) - self.landmark) / self.tau)
+        return [{"term": item, "score": round(weight * scale, 4)} for item, weight in self.top[:limit]]
+    
+    def _rebase(self, timestamp: float) -> None:
+        """Move the landmark forward and rescale stored weights to match"""
+        factor = math.exp(-(timestamp - self.landmark) / self.tau)
+        self.weights = {item: weight * factor for item, weight in self.weights.items() if weight * factor > 1e-12}
+        self.top = [(item, weight * factor) for item, weight in self.top]
+        self.landmark = timestamp
+
+class TrendingTracker:
+    """Thread-safe trending terms and bigrams, kept per scope (e.g. 'us/technology') and overall"""
+    
+    def __init__(self, half_life: float, max_items: int = 50000, top_size: int = 200,
+                 seen_capacity: int = 20000):
+        self.half_life = half_life
+        self.max_items = max_items
+        self.top_size = top_size
+        self.seen_capacity = seen_capacity
+        self._scopes: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+    
+    def observe(self, articles: Iterable[Dict[str, Any]], scopes: Iterable[str] = ()) -> int:
+        """Count the terms of every article not already seen in each scope; returns articles added"""
+        now = time.time()
+        added = 0
+        with self._lock:
+            targets = [self._scope("all")] + [self._scope(scope) for scope in scopes if scope != "all"]
+            for article in articles:
+                key = article.get("url") or article.get("title")
+                if not key:
+                    continue
+                
+                terms, bigrams = extract_terms(_headline_text(article))
+                timestamp = min(_published_timestamp(article.get("publishedAt")) or now, now)
+                for target in targets:
+                    if key in target["seen"]:
+                        continue
+                    target["seen"][key] = True
+                    if len(target["seen"]) > self.seen_capacity:
+                        target["seen"].popitem(last=False)
+                    
+                    for term in terms:
+                        target["terms"].add(term, timestamp)
+                    for bigram in bigrams:
+                        target["bigrams"].add(bigram, timestamp)
+                    target["articles"] += 1
+                    target["updated_at"] = now
+                    added += 1
+            
+            for target in targets:
+                target["terms"].refresh_top()
+                target["bigrams"].refresh_top()
+        return added
+    
+    def has_scope(self, scope: str) -> bool:
+        """True when at least one article has been observed in scope"""
+        with self._lock:
+            return scope in self._scopes and self._scopes[scope]["articles"] > 0
+    
+    def trending(self, scope: str = "all", limit: int = 20) -> Dict[str, Any]:
+        """Top terms and bigrams for scope, read from the cached top lists"""
+        with self._lock:
+            target = self._scopes.get(scope)
+            if target is None:
+                return {"scope": scope, "terms": [], "bigrams": [], "articles_observed": 0, "updated_at": None}
+            
+            now = time.time()
+            return {
+                "scope": scope,
+                "terms": target["terms"].most_common(limit, now),
+                "bigrams": target["bigrams"].most_common(limit, now),
+                "articles_observed": target["articles"],
+                "updated_at": datetime.fromtimestamp(target["updated_at"]).isoformat() if target["updated_at"] else None
+            }
+    
+    def _scope(self, scope: str) -> Dict[str, Any]:
+        """Get or create the counters for scope"""
+        if scope not in self._scopes:
+            self._scopes[scope] = {
+                "terms": DecayedCounter(self.half_life, self.max_items, self.top_size),
+                "bigrams": DecayedCounter(self.half_life, self.max_items, self.top_size),
+                "seen": OrderedDict(),
+                "articles": 0,
+                "updated_at": None
+            }
+        return self._scopes[scope]
+
+def _headline_text(article: Dict[str, Any]) -> str:
+    """Title without the trailing ' - Source Name' NewsAPI appends"""
+    title = article.get("title") or ""
+    source = (article.get("source") or {}).get("name")
+    if source and title.endswith(f" - {source}"):
+        title = title[:-len(source) - 3]
+    return title
+
+def _published_timestamp(published_at: Optional[str]) -> Optional[float]:
+    """Parse an ISO-8601 publishedAt value to a Unix timestamp"""
+    if not published_at:
+        return None
+    try:
+        return datetime.fromisoformat(published_at.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
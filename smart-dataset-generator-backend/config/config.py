@@ -22,6 +22,7 @@ class Config:
     
     # API URLs
     OPENWEATHER_BASE_URL = "http://api.openweathermap.org/data/2.5"
+    OPENWEATHER_ONECALL_URL = "https://api.openweathermap.org/data/3.0/onecall"
     ALPHAVANTAGE_BASE_URL = "https://www.alphavantage.co/query"
     NEWSAPI_BASE_URL = "https://newsapi.org/v2"
     PEXELS_BASE_URL = "https://api.pexels.com/v1"
@@ -34,6 +35,87 @@ class Config:
     
     # Rate limiting (requests per minute)
     RATE_LIMIT = 60
+    OPENWEATHER_CALLS_PER_MINUTE = int(os.getenv("OPENWEATHER_CALLS_PER_MINUTE", "60"))
+    ALPHAVANTAGE_CALLS_PER_MINUTE = int(os.getenv("ALPHAVANTAGE_CALLS_PER_MINUTE", "5"))
+    
+    # Live quote streaming (seconds)
+    QUOTE_STREAM_MIN_INTERVAL = float(os.getenv("QUOTE_STREAM_MIN_INTERVAL", "15"))
+    QUOTE_STREAM_MAX_INTERVAL = float(os.getenv("QUOTE_STREAM_MAX_INTERVAL", "300"))
+    QUOTE_STREAM_HEARTBEAT = float(os.getenv("QUOTE_STREAM_HEARTBEAT", "15"))
+    
+    # Batch weather lookups
+    WEATHER_BATCH_CONCURRENCY = int(os.getenv("WEATHER_BATCH_CONCURRENCY", "8"))
+    WEATHER_BATCH_MAX_LOCATIONS = int(os.getenv("WEATHER_BATCH_MAX_LOCATIONS", "200"))
+    
+    # Historical weather backfill
+    WEATHER_BACKFILL_DIR = os.path.join(DATA_DIR, "weather_backfill")
+    WEATHER_BACKFILL_CONCURRENCY = int(os.getenv("WEATHER_BACKFILL_CONCURRENCY", "4"))
+    WEATHER_BACKFILL_MAX_TASKS = int(os.getenv("WEATHER_BACKFILL_MAX_TASKS", "5000"))
+    
+    # Scheduled weather collection ("City,CC" or "lat,lon" entries separated by ';')
+    WEATHER_COLLECTOR_ENABLED = os.getenv("WEATHER_COLLECTOR_ENABLED", "false").lower() == "true"
+    WEATHER_COLLECTOR_LOCATIONS = os.getenv("WEATHER_COLLECTOR_LOCATIONS", "")
+    WEATHER_COLLECTOR_INTERVAL = int(os.getenv("WEATHER_COLLECTOR_INTERVAL", "900"))
+    WEATHER_SERIES_DIR = os.path.join(DATA_DIR, "weather_series")
+    
+    # News crawling
+    NEWS_CRAWL_MAX_PAGES = int(os.getenv("NEWS_CRAWL_MAX_PAGES", "10"))
+    NEWS_CRAWL_CONCURRENCY = int(os.getenv("NEWS_CRAWL_CONCURRENCY", "4"))
+    NEWS_FANOUT_MAX_QUERIES = int(os.getenv("NEWS_FANOUT_MAX_QUERIES", "20"))
+    
+    # Trending topics
+    NEWS_TRENDING_HALF_LIFE = int(os.getenv("NEWS_TRENDING_HALF_LIFE", "21600"))
+    NEWS_TRENDING_MAX_TERMS = int(os.getenv("NEWS_TRENDING_MAX_TERMS", "50000"))
+    NEWS_INDEX_DIR = os.path.join(DATA_DIR, "news_index")
+    
+    # Article full-text enrichment
+    ARTICLE_TEXT_CONCURRENCY = int(os.getenv("ARTICLE_TEXT_CONCURRENCY", "8"))
+    ARTICLE_TEXT_DOMAIN_DELAY = float(os.getenv("ARTICLE_TEXT_DOMAIN_DELAY", "1.0"))
+    ARTICLE_TEXT_DEADLINE = int(os.getenv("ARTICLE_TEXT_DEADLINE", "30"))
+    ARTICLE_TEXT_MAX_BYTES = int(os.getenv("ARTICLE_TEXT_MAX_BYTES", "2000000"))
+    ARTICLE_TEXT_MAX_CHARS = int(os.getenv("ARTICLE_TEXT_MAX_CHARS", "50000"))
+    ARTICLE_TEXT_CACHE_SIZE = int(os.getenv("ARTICLE_TEXT_CACHE_SIZE", "500"))
+    ARTICLE_TEXT_CACHE_TTL = int(os.getenv("ARTICLE_TEXT_CACHE_TTL", "86400"))
+    
+    # News sources catalog
+    NEWS_SOURCES_FILE = os.path.join(DATA_DIR, "news_sources.json")
+    NEWS_SOURCES_REFRESH_INTERVAL = int(os.getenv("NEWS_SOURCES_REFRESH_INTERVAL", "86400"))
+    
+    # Category image search (pages fetched per category term)
+    PEXELS_CATEGORY_MAX_PAGES = int(os.getenv("PEXELS_CATEGORY_MAX_PAGES", "5"))
+    
+    # Image processing
+    IMAGE_PROCESS_WORKERS = int(os.getenv("IMAGE_PROCESS_WORKERS", str(os.cpu_count() or 2)))
+    IMAGE_DEDUP_MAX_DISTANCE = int(os.getenv("IMAGE_DEDUP_MAX_DISTANCE", "6"))
+    IMAGE_ZIP_MAX_IMAGES = int(os.getenv("IMAGE_ZIP_MAX_IMAGES", "80"))
+    IMAGE_CACHE_DIR = os.path.join(DATA_DIR, "image_cache")
+    IMAGE_CACHE_MAX_BYTES = int(os.getenv("IMAGE_CACHE_MAX_BYTES", str(2 * 1024 ** 3)))
+    
+    # Image dataset builder
+    PEXELS_CALLS_PER_HOUR = int(os.getenv("PEXELS_CALLS_PER_HOUR", "200"))
+    IMAGE_DATASET_DIR = os.path.join(DATA_DIR, "image_datasets")
+    IMAGE_DATASET_CONCURRENCY = int(os.getenv("IMAGE_DATASET_CONCURRENCY", "8"))
+    IMAGE_DATASET_MAX_IMAGES = int(os.getenv("IMAGE_DATASET_MAX_IMAGES", "5000"))
+    
+    # Video export
+    VIDEO_DOWNLOAD_CONCURRENCY = int(os.getenv("VIDEO_DOWNLOAD_CONCURRENCY", "4"))
+    VIDEO_DOWNLOAD_RETRIES = int(os.getenv("VIDEO_DOWNLOAD_RETRIES", "5"))
+    VIDEO_BANDWIDTH_BYTES_PER_SEC = int(os.getenv("VIDEO_BANDWIDTH_BYTES_PER_SEC", "20000000"))
+    VIDEO_EXPORT_MAX_VIDEOS = int(os.getenv("VIDEO_EXPORT_MAX_VIDEOS", "80"))
+    
+    # COVID-19 time-series store
+    COVID_SERIES_DIR = os.path.join(DATA_DIR, "covid_series")
+    COVID_SERIES_WINDOW_DAYS = int(os.getenv("COVID_SERIES_WINDOW_DAYS", "60"))
+    COVID_SERIES_CONCURRENCY = int(os.getenv("COVID_SERIES_CONCURRENCY", "4"))
+    
+    # Caching (seconds)
+    FOREX_CACHE_TTL = int(os.getenv("FOREX_CACHE_TTL", "300"))
+    WEATHER_CACHE_TTL = int(os.getenv("WEATHER_CACHE_TTL", "600"))
+    COVID_SUMMARY_CACHE_TTL = int(os.getenv("COVID_SUMMARY_CACHE_TTL", "1800"))
+    
+    # Spatial weather cache: grid cell size (degrees) and reuse radius (km)
+    WEATHER_CACHE_GRID_DEGREES = float(os.getenv("WEATHER_CACHE_GRID_DEGREES", "0.01"))
+    WEATHER_CACHE_RADIUS_KM = float(os.getenv("WEATHER_CACHE_RADIUS_KM", "2.0"))
     
     @classmethod
     def validate_api_keys(cls) -> dict:
@@ -102,6 +102,28 @@ def test_services():
         print(f"✗ Service initialization error: {e}")
         return False
 
+def test_near_duplicates():
+    """Test that a syndicated copy with a one-word edit clusters with its original"""
+    print("\nTesting near-duplicate detection...")
+    
+    from app.utils.helpers import mark_near_duplicates
+    
+    articles = [
+        {"title": "Central bank raises interest rates by half a point to fight inflation",
+         "description": "The central bank raised its benchmark rate by 50 basis points on Wednesday, the largest increase in two decades, as policymakers moved to cool persistent inflation."},
+        {"title": "Central bank raises interest rates by half a point to fight stubborn inflation",
+         "description": "The central bank raised its benchmark rate by 50 basis points on Wednesday, the largest increase in two decades, as policymakers moved to cool persistent inflation."},
+        {"title": "Wildfire forces thousands to evacuate in northern California",
+         "description": "Firefighters battled strong winds as a fast-moving wildfire destroyed dozens of homes and forced thousands of residents to flee overnight."}
+    ]
+    
+    clusters = [article["duplicate_cluster"] for article in mark_near_duplicates(articles)]
+    assert clusters[0] == clusters[1], "one-word edit not detected as near-duplicate"
+    assert clusters[0] != clusters[2], "unrelated article clustered as near-duplicate"
+    assert len(mark_near_duplicates(articles, drop=True)) == 2
+    print("✓ Near-duplicate detection working")
+    return True
+
 def main():
     """Main test function"""
     print("=" * 60)
@@ -125,6 +147,10 @@ def main():
     if not test_services():
         all_tests_passed = False
     
+    # Test near-duplicate detection
+    if not test_near_duplicates():
+        all_tests_passed = False
+    
     print("\n" + "=" * 60)
     if all_tests_passed:
         print("🎉 ALL TESTS PASSED!")
@@ -75,6 +75,33 @@ class APITester:
         result = self.test_endpoint("GET", "/api/weather/forecast", {"city": "New York", "days": 3})
         self.results.append(result)
         print(f"✓ Weather Forecast: {'PASS' if result['success'] else 'FAIL'}")
+        
+        # Test daily aggregated forecast
+        result = self.test_endpoint("GET", "/api/weather/forecast", {"city": "London", "days": 5, "view": "daily"})
+        self.results.append(result)
+        print(f"✓ Daily Forecast: {'PASS' if result['success'] else 'FAIL'}")
+        
+        # Test historical weather backfill
+        result = self.test_endpoint("POST", "/api/weather/backfill",
+                                  data={"locations": ["London"], "start_date": "2024-01-01", "end_date": "2024-01-03"})
+        self.results.append(result)
+        print(f"✓ Weather Backfill: {'PASS' if result['success'] else 'FAIL'}")
+        
+        # Test weather collector status
+        result = self.test_endpoint("GET", "/api/weather/series/status")
+        self.results.append(result)
+        print(f"✓ Weather Collector Status: {'PASS' if result['success'] else 'FAIL'}")
+        
+        # Test city autocomplete
+        result = self.test_endpoint("GET", "/api/weather/cities", {"prefix": "lon"})
+        self.results.append(result)
+        print(f"✓ City Autocomplete: {'PASS' if result['success'] else 'FAIL'}")
+        
+        # Test batch weather
+        result = self.test_endpoint("GET", "/api/weather/batch",
+                                  {"cities": ["London", "london ", "Paris,FR"], "coordinates": ["40.7128,-74.0060"]})
+        self.results.append(result)
+        print(f"✓ Batch Weather: {'PASS' if result['success'] else 'FAIL'}")
     
     def test_stock_apis(self):
         """Test stock market API endpoints"""
@@ -94,6 +121,16 @@ class APITester:
         result = self.test_endpoint("GET", "/api/stocks/company/GOOGL")
         self.results.append(result)
         print(f"✓ Company Overview: {'PASS' if result['success'] else 'FAIL'}")
+        
+        # Test quote stream status
+        result = self.test_endpoint("GET", "/api/stocks/stream-status")
+        self.results.append(result)
+        print(f"✓ Quote Stream Status: {'PASS' if result['success'] else 'FAIL'}")
+        
+        # Test forex cross-rate matrix
+        result = self.test_endpoint("GET", "/api/forex/matrix", {"currencies": "EUR,GBP,JPY"})
+        self.results.append(result)
+        print(f"✓ Forex Matrix: {'PASS' if result['success'] else 'FAIL'}")
     
     def test_news_apis(self):
         """Test news API endpoints"""
@@ -104,13 +141,38 @@ class APITester:
         self.results.append(result)
         print(f"✓ Top Headlines: {'PASS' if result['success'] else 'FAIL'}")
         
+        # Test news sources catalog
+        result = self.test_endpoint("GET", "/api/news/sources", {"category": "technology", "language": "en"})
+        self.results.append(result)
+        print(f"✓ News Sources: {'PASS' if result['success'] else 'FAIL'}")
+        
         # Test news search
         result = self.test_endpoint("GET", "/api/news/search", {"query": "technology", "page_size": 10})
         self.results.append(result)
         print(f"✓ News Search: {'PASS' if result['success'] else 'FAIL'}")
         
+        # Test multi-page news crawl
+        result = self.test_endpoint("GET", "/api/news/crawl", {"query": "technology", "max_pages": 2})
+        self.results.append(result)
+        print(f"✓ News Crawl: {'PASS' if result['success'] else 'FAIL'}")
+        
+        # Test per-keyword fan-out
+        result = self.test_endpoint("GET", "/api/news/keywords", {"keywords": ["ai", "climate"], "page_size": 10})
+        self.results.append(result)
+        print(f"✓ News by Keywords: {'PASS' if result['success'] else 'FAIL'}")
+        
+        # Test per-domain fan-out
+        result = self.test_endpoint("GET", "/api/news/domains", {"domains": ["bbc.co.uk", "techcrunch.com"], "page_size": 10})
+        self.results.append(result)
+        print(f"✓ News by Domains: {'PASS' if result['success'] else 'FAIL'}")
+        
+        # Test local BM25 search over fetched articles
+        result = self.test_endpoint("GET", "/api/news/local-search", {"query": "technology", "page_size": 10})
+        self.results.append(result)
+        print(f"✓ Local News Search: {'PASS' if result['success'] else 'FAIL'}")
+        
         # Test trending topics
-        result = self.test_endpoint("GET", "/api/news/trending", {"country": "us", "category": "technology"})
+        result = self.test_endpoint("GET", "/api/news/trending", {"country": "us", "category": "technology", "limit": 10})
         self.results.append(result)
         print(f"✓ Trending Topics: {'PASS' if result['success'] else 'FAIL'}")
     
@@ -132,6 +194,28 @@ class APITester:
         result = self.test_endpoint("GET", "/api/images/category/business", {"per_page": 10})
         self.results.append(result)
         print(f"✓ Images by Category: {'PASS' if result['success'] else 'FAIL'}")
+        
+        # Test deeper page of merged category results
+        result = self.test_endpoint("GET", "/api/images/category/nature", {"per_page": 50, "page": 2})
+        self.results.append(result)
+        print(f"✓ Images by Category (page 2): {'PASS' if result['success'] else 'FAIL'}")
+        
+        # Test image dataset job
+        result = self.test_endpoint("POST", "/api/images/dataset",
+                                  data={"queries": ["cats", "dogs"], "images_per_query": 20})
+        self.results.append(result)
+        print(f"✓ Image Dataset Job: {'PASS' if result['success'] else 'FAIL'}")
+        
+        # Test sharded image dataset job
+        result = self.test_endpoint("POST", "/api/images/dataset",
+                                  data={"queries": ["cats", "dogs"], "images_per_query": 20, "shard_size": 10})
+        self.results.append(result)
+        print(f"✓ Sharded Image Dataset Job: {'PASS' if result['success'] else 'FAIL'}")
+        
+        # Test video search
+        result = self.test_endpoint("GET", "/api/videos/search", {"query": "ocean", "per_page": 5, "quality": "hd"})
+        self.results.append(result)
+        print(f"✓ Video Search: {'PASS' if result['success'] else 'FAIL'}")
     
     def test_covid_apis(self):
         """Test COVID-19 API endpoints"""
@@ -152,6 +236,16 @@ class APITester:
         self.results.append(result)
         print(f"✓ Top Countries: {'PASS' if result['success'] else 'FAIL'}")
         
+        # Test top countries by another metric
+        result = self.test_endpoint("GET", "/api/covid/top-countries", {"limit": 5, "metric": "TotalDeaths"})
+        self.results.append(result)
+        print(f"✓ Top Countries by Deaths: {'PASS' if result['success'] else 'FAIL'}")
+        
+        # Test COVID time series with derived metrics
+        result = self.test_endpoint("GET", "/api/covid/series/united-states", {"start": "2021-01-01", "end": "2021-03-31"})
+        self.results.append(result)
+        print(f"✓ COVID Time Series: {'PASS' if result['success'] else 'FAIL'}")
+        
         # Test available countries
         result = self.test_endpoint("GET", "/api/covid/countries")
         self.results.append(result)
@@ -197,6 +291,16 @@ class APITester:
         self.results.append(result)
         print(f"✓ Weather JSON Download: {'PASS' if result['success'] else 'FAIL'}")
         
+        # Test forecast Parquet download
+        result = self.test_endpoint("GET", "/download/weather/forecast/parquet", {"city": "London"})
+        self.results.append(result)
+        print(f"✓ Forecast Parquet Download: {'PASS' if result['success'] else 'FAIL'}")
+        
+        # Test batch weather CSV download
+        result = self.test_endpoint("GET", "/download/weather/batch/csv", {"cities": ["London", "Tokyo"]})
+        self.results.append(result)
+        print(f"✓ Batch Weather CSV Download: {'PASS' if result['success'] else 'FAIL'}")
+        
         # Test stock CSV download
         result = self.test_endpoint("GET", "/download/stocks/csv/AAPL")
         self.results.append(result)
@@ -217,16 +321,61 @@ class APITester:
         self.results.append(result)
         print(f"✓ News JSON Download: {'PASS' if result['success'] else 'FAIL'}")
         
+        # Test streamed news crawl CSV download
+        result = self.test_endpoint("GET", "/download/news/crawl/csv", {"query": "technology", "max_pages": 2})
+        self.results.append(result)
+        print(f"✓ News Crawl CSV Download: {'PASS' if result['success'] else 'FAIL'}")
+        
+        # Test keyword/domain fan-out CSV download
+        result = self.test_endpoint("GET", "/download/news/fan-out/csv", {"keywords": ["ai", "climate"], "domains": ["bbc.co.uk"]})
+        self.results.append(result)
+        print(f"✓ News Fan-out CSV Download: {'PASS' if result['success'] else 'FAIL'}")
+        
+        # Test news CSV download with full article text
+        result = self.test_endpoint("GET", "/download/news/csv", {"query": "technology", "page_size": 5, "full_text": True})
+        self.results.append(result)
+        print(f"✓ Full-text News CSV Download: {'PASS' if result['success'] else 'FAIL'}")
+        
+        # Test near-duplicate filtered news CSV download
+        result = self.test_endpoint("GET", "/download/news/csv", {"query": "technology", "page_size": 50, "dedup": True})
+        self.results.append(result)
+        print(f"✓ Deduplicated News CSV Download: {'PASS' if result['success'] else 'FAIL'}")
+        
         # Test image ZIP download
         result = self.test_endpoint("GET", "/download/images/zip", {"query": "nature", "per_page": 5})
         self.results.append(result)
         print(f"✓ Image ZIP Download: {'PASS' if result['success'] else 'FAIL'}")
         
+        # Test resized image ZIP download
+        result = self.test_endpoint("GET", "/download/images/zip", {"query": "nature", "per_page": 5, "width": 224, "height": 224, "fit": "crop", "format": "webp"})
+        self.results.append(result)
+        print(f"✓ Resized Image ZIP Download: {'PASS' if result['success'] else 'FAIL'}")
+        
+        # Test perceptual-hash deduplicated image ZIP download
+        result = self.test_endpoint("GET", "/download/images/zip", {"query": "nature", "per_page": 10, "dedup": True, "max_distance": 6})
+        self.results.append(result)
+        print(f"✓ Deduplicated Image ZIP Download: {'PASS' if result['success'] else 'FAIL'}")
+        
+        # Test image ZIP download with pixel features
+        result = self.test_endpoint("GET", "/download/images/zip", {"query": "nature", "per_page": 5, "features": True})
+        self.results.append(result)
+        print(f"✓ Image ZIP with Features Download: {'PASS' if result['success'] else 'FAIL'}")
+        
+        # Test streamed video ZIP download
+        result = self.test_endpoint("GET", "/download/videos/zip", {"query": "ocean", "per_page": 2, "quality": "sd"})
+        self.results.append(result)
+        print(f"✓ Video ZIP Download: {'PASS' if result['success'] else 'FAIL'}")
+        
         # Test COVID CSV download
         result = self.test_endpoint("GET", "/download/covid/csv/US")
         self.results.append(result)
         print(f"✓ COVID CSV Download: {'PASS' if result['success'] else 'FAIL'}")
         
+        # Test COVID time series Parquet download
+        result = self.test_endpoint("GET", "/download/covid/series/united-states/parquet", {"start": "2021-01-01", "end": "2021-03-31"})
+        self.results.append(result)
+        print(f"✓ COVID Series Parquet Download: {'PASS' if result['success'] else 'FAIL'}")
+        
         # Test COVID JSON download
         result = self.test_endpoint("GET", "/download/covid/json/UK")
         self.results.append(result)